@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: search-form dropdown interaction in the Selenium path.
+Compares the old fixed time.sleep() waits with the condition-based waits
+against a local fixture page (requires Chrome, no network).
+Run from project root: uv run python benchmarks/bench_dropdown.py [iterations]
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Project root
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+FIXTURE = ROOT / "benchmarks" / "fixtures" / "search_form.html"
+
+
+class _FormHandler(BaseHTTPRequestHandler):
+    """Serves the search-form fixture for every /autos URL."""
+
+    def do_GET(self) -> None:
+        body = FIXTURE.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def legacy_scrape_dropdown(scraper, driver, base_url: str, make_id: str):
+    """The pre-change interaction: same clicks, fixed sleeps (0.5 + 0.4 + 0.3 + 0.5 + 0.2 s)."""
+    from selenium.webdriver.common.by import By
+
+    scraper._load(driver, f"{base_url}/autos")
+    time.sleep(0.5)
+    driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"] .tz-dropdown__selected').click()
+    time.sleep(0.4)
+    make_cont = driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"]')
+    make_cont.find_element(By.CSS_SELECTOR, ".tz-dropdown__selected").click()
+    time.sleep(0.3)
+    for el in make_cont.find_elements(By.CSS_SELECTOR, ".tz-dropdown__list .tz-dropdown__option"):
+        if (el.get_attribute("data-val") or "").strip() == make_id:
+            driver.execute_script("arguments[0].click()", el)
+            break
+    time.sleep(0.5)
+    driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_model"] .tz-dropdown__selected').click()
+    time.sleep(0.2)
+    return scraper._parse_tz_dropdown_options(driver, "q_model")
+
+
+def _time(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        models = fn()
+        samples.append(time.perf_counter() - start)
+        assert models, "no model options read"
+    return samples
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FormHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    os.environ["TURBOAZ_BASE_URL"] = f"http://127.0.0.1:{httpd.server_port}"
+    os.environ["TURBOAZ_ENGINE"] = "selenium"
+
+    from src.scraper import BASE_URL, TurboAzScraper
+    scraper = TurboAzScraper(pool_size=1)
+    driver = scraper.pool.acquire()
+    try:
+        # Warm the browser so the first sample does not include Chrome startup
+        scraper._scrape_dropdown(driver, "3")
+        legacy = _time(lambda: legacy_scrape_dropdown(scraper, driver, BASE_URL, "3"), iterations)
+        current = _time(lambda: scraper._scrape_dropdown(driver, "3"), iterations)
+    finally:
+        scraper.pool.release(driver)
+        scraper._close_driver()
+        httpd.shutdown()
+
+    for name, samples in (("fixed sleeps", legacy), ("condition waits", current)):
+        print(f"{name:>16}: median {statistics.median(samples) * 1000:7.1f} ms  "
+              f"mean {statistics.mean(samples) * 1000:7.1f} ms  (n={len(samples)})")
+    saved = statistics.median(legacy) - statistics.median(current)
+    print(f"{'saved per call':>16}: {saved * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
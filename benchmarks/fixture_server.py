@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixture server: a local stand-in for turbo.az.
+Serves /autos listing pages (with make/model dropdowns and pagination),
+/autos/<id> detail pages and /images/<name>.jpg photos built from the
+templates in benchmarks/fixtures, with configurable latency and jitter.
+Run from project root: uv run python benchmarks/fixture_server.py [--port 8765] [--latency-ms 80] [--jitter-ms 20]
+"""
+
+import argparse
+import asyncio
+import io
+import random
+from pathlib import Path
+from string import Template
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Listings per results page, as on the site.
+PAGE_SIZE = 24
+# Listings behind each make (and behind the unfiltered search).
+LISTINGS_PER_MAKE = 600
+PHOTOS_PER_LISTING = 8
+PHOTO_SIZE = (1280, 960)
+
+MAKES = {
+    "1": ("Audi", ["A4", "A6", "Q5", "Q7"]),
+    "3": ("BMW", ["X3", "X5", "X5 M", "X6", "320", "520"]),
+    "4": ("Mercedes", ["C 200", "E 220", "E 300", "S 500", "GLE 350"]),
+    "7": ("Hyundai", ["Elantra", "Sonata", "Tucson", "Santa Fe"]),
+    "9": ("Kia", ["Rio", "Optima", "Sportage", "Sorento"]),
+    "12": ("Lexus", ["ES 250", "GX 460", "LX 570", "RX 350"]),
+    "15": ("Toyota", ["Camry", "Corolla", "Land Cruiser", "Prado", "RAV 4"]),
+    "23": ("LADA (VAZ)", ["2107", "2106", "Niva", "Priora"]),
+}
+CITIES = ["Bakı", "Gəncə", "Sumqayıt", "Xırdalan", "Mingəçevir", "Lənkəran"]
+
+
+def _model_id(make_id: str, pos: int) -> str:
+    return f"{make_id}{pos + 1:02d}"
+
+
+def _option(val: str, label: str) -> str:
+    return (
+        f'<div class="tz-dropdown__option" data-val="{val}">'
+        f'<div class="tz-dropdown__option-label"><span class="text">{label}</span></div></div>'
+    )
+
+
+def _grouped(n: int) -> str:
+    """12500 -> "12 500" (site number format)."""
+    return f"{n:,}".replace(",", " ")
+
+
+def listing(listing_id: int) -> dict:
+    """Deterministic listing fields for an ID (same values on result cards and detail pages)."""
+    rng = random.Random(listing_id)
+    make_id = rng.choice(sorted(MAKES))
+    make, models = MAKES[make_id]
+    if listing_id >= 1_000_000:
+        # IDs handed out by a make-filtered search belong to that make.
+        make_id = str(listing_id // 1_000_000)
+        make, models = MAKES.get(make_id, (make, models))
+    model = rng.choice(models)
+    currency = rng.choice(["AZN", "AZN", "$"])
+    return {
+        "id": listing_id,
+        "slug": f"{make}-{model}".lower().replace(" ", "-").replace("(", "").replace(")", ""),
+        "title": f"{make} {model}",
+        "make": make,
+        "model": model,
+        "price": _grouped(rng.randrange(4_000, 150_000, 100)),
+        "currency": currency,
+        "year": rng.randint(1998, 2026),
+        "engine": f"{rng.choice([1.4, 1.6, 2.0, 2.5, 3.0, 3.5, 4.4]):.1f}",
+        "mileage": _grouped(rng.randrange(0, 400_000, 1000)),
+        "city": rng.choice(CITIES),
+        "time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+        "views": rng.randint(10, 20_000),
+    }
+
+
+def _make_photo() -> bytes:
+    """One camera-sized JPEG with enough detail that decoding and resizing cost something."""
+    from PIL import Image, ImageDraw
+
+    img = Image.effect_noise(PHOTO_SIZE, 24).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    rng = random.Random(0)
+    for _ in range(40):
+        x, y = rng.randrange(PHOTO_SIZE[0]), rng.randrange(PHOTO_SIZE[1])
+        draw.ellipse(
+            (x, y, x + rng.randint(40, 400), y + rng.randint(40, 300)),
+            fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+        )
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=85)
+    return out.getvalue()
+
+
+class FixtureSite:
+    """aiohttp handlers for the stand-in site; every response waits latency +/- jitter first."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._autos = Template((FIXTURES / "autos.html").read_text(encoding="utf-8"))
+        self._card = Template((FIXTURES / "listing_card.html").read_text(encoding="utf-8"))
+        self._details = Template((FIXTURES / "listing.html").read_text(encoding="utf-8"))
+        self._photo = _make_photo()
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def autos(self, request: web.Request) -> web.Response:
+        await self._delay()
+        make_id = request.query.get("q[make][]", "")
+        page = max(1, int(request.query.get("page", "1") or 1))
+        make_options = "\n".join(_option(val, name) for val, (name, _) in MAKES.items())
+        model_options = ""
+        if make_id in MAKES:
+            model_options = "\n".join(
+                _option(_model_id(make_id, pos), name) for pos, name in enumerate(MAKES[make_id][1])
+            )
+        # Listing IDs: make-filtered searches get make_id * 1e6 + n, the unfiltered one 100000 + n.
+        first_id = (int(make_id) * 1_000_000 if make_id in MAKES else 100_000) + (page - 1) * PAGE_SIZE
+        count = max(0, min(PAGE_SIZE, LISTINGS_PER_MAKE - (page - 1) * PAGE_SIZE))
+        cards = "\n".join(self._card.substitute(listing(first_id + i)) for i in range(count))
+        html = self._autos.substitute(
+            make_options=make_options,
+            model_options=model_options,
+            total=_grouped(LISTINGS_PER_MAKE),
+            cards=cards,
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def details(self, request: web.Request) -> web.Response:
+        await self._delay()
+        try:
+            listing_id = int(request.match_info["listing"].split("-", 1)[0])
+        except ValueError:
+            raise web.HTTPNotFound()
+        photos = "\n".join(
+            f'<div class="product-photos__slider-top-i"><img src="/images/{listing_id}-{n}.jpg"></div>'
+            for n in range(PHOTOS_PER_LISTING)
+        )
+        html = self._details.substitute(listing(listing_id), photos=photos)
+        return web.Response(text=html, content_type="text/html")
+
+    async def image(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.Response(body=self._photo, content_type="image/jpeg")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/autos", self.autos)
+        app.router.add_get("/autos/{listing}", self.details)
+        app.router.add_get("/images/{name}", self.image)
+        return app
+
+
+async def start_fixture_server(
+    host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0
+) -> tuple[web.AppRunner, str]:
+    """Starts the fixture site on the running loop; returns (runner, base_url). Port 0 picks a free port."""
+    runner = web.AppRunner(FixtureSite(latency_ms, jitter_ms).app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    runner, base_url = await start_fixture_server(args.host, args.port, args.latency_ms, args.jitter_ms)
+    print(base_url, flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="base response delay")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +/- spread around the delay")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: runs tool scenarios against the local fixture server
+(benchmarks/fixture_server.py, no Chrome or turbo.az needed with the HTTP engine)
+and reports p50/p95/p99 latency, throughput and peak RSS per scenario.
+Each scenario runs in its own process; results are written to
+benchmarks/results/<commit>.json for comparison between commits.
+Run from project root:
+    uv run python benchmarks/run.py [--scenario NAME ...] [--requests N] [--concurrency N]
+    uv run python benchmarks/run.py --compare benchmarks/results/<old>.json
+    uv run python benchmarks/run.py --diff OLD.json NEW.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Project root
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+SCENARIOS = ("cold_start", "search_cars", "get_car_details", "get_makes_models", "mixed_stdio", "mixed_http")
+MAKES = ["BMW", "Mercedes", "Toyota", "Kia", "Lexus", "Hyundai", "Audi"]
+# Metrics shown in reports and compared between runs: (key path, label, higher is better).
+REPORTED = (
+    (("latency_ms", "p50"), "p50 ms", False),
+    (("latency_ms", "p95"), "p95 ms", False),
+    (("latency_ms", "p99"), "p99 ms", False),
+    (("throughput_rps",), "req/s", True),
+    (("peak_rss_mb",), "RSS MB", False),
+    (("server_peak_rss_mb",), "server RSS MB", False),
+    (("import_ms",), "import ms", False),
+)
+# Modules the server must not load to answer initialize/list_tools.
+HEAVY_MODULES = ("selenium", "webdriver_manager", "PIL", "aiohttp")
+# Cold starts measured per run (each spawns a server process).
+COLD_START_RUNS = 10
+
+
+def _tool_ok(contents) -> bool:
+    """True when a tool reply's first text block is a JSON result with success set."""
+    try:
+        return bool(json.loads(contents[0].text).get("success"))
+    except (IndexError, AttributeError, ValueError):
+        return False
+
+
+def _peak_rss_mb(who: int) -> float:
+    """Peak RSS of this process (RUSAGE_SELF) or of its largest waited-for child (RUSAGE_CHILDREN)."""
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summary(samples: list[float], errors: int, duration: float, concurrency: int) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    cuts = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else ms * 99
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(ms) / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "p50": round(cuts[49], 2),
+            "p95": round(cuts[94], 2),
+            "p99": round(cuts[98], 2),
+            "mean": round(statistics.fmean(ms), 2),
+            "max": round(ms[-1], 2),
+        },
+    }
+
+
+async def _load(call, requests: int, concurrency: int, warmup: int) -> dict:
+    """
+    Closed-loop load: `concurrency` workers issue call(i) for i in range(requests).
+    call returns True on success; exceptions count as errors. Warm-up calls are not recorded.
+    """
+    for i in range(warmup):
+        await call(requests + i)
+
+    samples: list[float] = []
+    errors = 0
+    next_index = iter(range(requests))
+
+    async def _worker() -> None:
+        nonlocal errors
+        for i in next_index:
+            start = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            samples.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+    return _summary(samples, errors, time.perf_counter() - start, concurrency)
+
+
+def _mixed_call(i: int) -> tuple[str, dict]:
+    """Tool call number i of the mixed workload: 50% search, 30% details, 20% makes/models."""
+    kind = i % 10
+    if kind < 5:
+        return "search_cars", {"make": MAKES[i % len(MAKES)], "price_min": 1000 + i, "limit": 20}
+    if kind < 8:
+        return "get_car_details", {"listing_id": str(200_000 + i)}
+    return "get_makes_models", {"make": MAKES[i % len(MAKES)] if kind == 9 else None}
+
+
+def _import_time_ms() -> tuple[float, list[tuple[str, float]]]:
+    """`import src.server` time from `python -X importtime`, and its heaviest direct imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.server"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    children: list[tuple[str, float]] = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name, ms = parts[2].rstrip(), int(parts[1]) / 1000
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        # A module is printed after everything it imported
+        if depth == 0:
+            if name.strip() == "src.server":
+                children.sort(key=lambda item: item[1], reverse=True)
+                return round(ms, 1), [(n, round(t, 1)) for n, t in children[:5]]
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), ms))
+    raise RuntimeError("src.server missing from -X importtime output")
+
+
+def _heavy_modules_after_list_tools() -> list[str]:
+    """Heavy modules loaded after importing the server and answering list_tools in-process."""
+    code = (
+        "import asyncio, json, sys\n"
+        "import src.server as s\n"
+        "asyncio.run(s.list_tools())\n"
+        f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+async def _scenario_cold_start(args) -> dict:
+    """Process spawn to answered initialize + list_tools over stdio; import cost of src.server."""
+    from mcp.client.session import ClientSession
+    from mcp.client.stdio import StdioServerParameters, stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=["-m", "src.server"], cwd=str(ROOT), env=dict(os.environ))
+    samples = []
+    start = time.perf_counter()
+    for _ in range(min(args.requests, COLD_START_RUNS)):
+        t0 = time.perf_counter()
+        async with stdio_client(params) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                await session.list_tools()
+                samples.append(time.perf_counter() - t0)
+    result = _summary(samples, 0, time.perf_counter() - start, 1)
+    result["import_ms"], result["slowest_imports_ms"] = _import_time_ms()
+    result["import_budget_ms"] = args.import_budget_ms
+    result["over_budget"] = result["import_ms"] > args.import_budget_ms
+    result["heavy_modules_loaded"] = _heavy_modules_after_list_tools()
+    return result
+
+
+async def _scenario_search_cars(args) -> dict:
+    from src.scraper import TurboAzScraper
+    scraper = TurboAzScraper()
+
+    async def call(i: int) -> bool:
+        # Distinct price filters keep requests from sharing one in-flight fetch
+        result = await scraper.search_cars(make=MAKES[i % len(MAKES)], price_min=1000 + i, limit=20)
+        return bool(result.get("success"))
+
+    return await _load(call, args.requests, args.concurrency, args.warmup)
+
+
+async def _scenario_get_car_details(args) -> dict:
+    # Through the tool handler, so image download and resize are included
+    from src import server
+
+    async def call(i: int) -> bool:
+        return _tool_ok(await server.call_tool("get_car_details", {"listing_id": str(100_000 + i)}))
+
+    try:
+        return await _load(call, args.requests, args.concurrency, args.warmup)
+    finally:
+        await server._get_images().close()
+
+
+async def _scenario_get_makes_models(args) -> dict:
+    from src.scraper import TurboAzScraper
+    scraper = TurboAzScraper()
+
+    async def call(i: int) -> bool:
+        result = await scraper.get_makes_models(MAKES[i % len(MAKES)] if i % 2 else None)
+        return bool(result.get("success"))
+
+    return await _load(call, args.requests, args.concurrency, args.warmup)
+
+
+async def _client_load(session, args) -> dict:
+    async def call(i: int) -> bool:
+        name, arguments = _mixed_call(i)
+        result = await session.call_tool(name, {k: v for k, v in arguments.items() if v is not None})
+        return not result.isError and _tool_ok(result.content)
+
+    await session.initialize()
+    return await _load(call, args.requests, args.concurrency, args.warmup)
+
+
+async def _scenario_mixed_stdio(args) -> dict:
+    from mcp.client.session import ClientSession
+    from mcp.client.stdio import StdioServerParameters, stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=["-m", "src.server"], cwd=str(ROOT), env=dict(os.environ))
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            return await _client_load(session, args)
+
+
+def _wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not listen on port {port} within {timeout:.0f}s")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _scenario_mixed_http(args) -> dict:
+    from mcp.client.session import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    port = _free_port()
+    env = dict(os.environ, TURBOAZ_HTTP_PORT=str(port))
+    proc = subprocess.Popen([sys.executable, "-m", "src.server_http"], cwd=str(ROOT), env=env)
+    try:
+        _wait_for_port(port, proc)
+        async with streamablehttp_client(f"http://127.0.0.1:{port}/mcp") as (read, write, _):
+            async with ClientSession(read, write) as session:
+                return await _client_load(session, args)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def _run_child(args) -> None:
+    """Runs one scenario in this process and prints its summary as JSON."""
+    scenario = globals()[f"_scenario_{args.child}"]
+    result = asyncio.run(scenario(args))
+    result["peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF)
+    # Server subprocesses have been waited for by now
+    result["server_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    print(json.dumps(result), flush=True)
+
+
+def _scenario_env(args, base_url: str, cache_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "TURBOAZ_BASE_URL": base_url,
+        "TURBOAZ_ENGINE": args.engine,
+        "TURBOAZ_CACHE_DIR": cache_dir,
+        # Measure the tools, not the per-host rate limit the fixture server does not need
+        "TURBOAZ_RATE_LIMIT": "0",
+    })
+    if not args.warm:
+        # Every request does the full fetch/parse/resize work
+        env.update({"TURBOAZ_SEARCH_TTL": "0", "TURBOAZ_DETAILS_TTL": "0", "TURBOAZ_THUMB_CACHE_MAX_BYTES": "0"})
+    return env
+
+
+def _start_fixture_server(args) -> tuple[subprocess.Popen, str]:
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / "benchmarks" / "fixture_server.py"), "--port", "0",
+         "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    base_url = proc.stdout.readline().strip()
+    if not base_url:
+        proc.kill()
+        raise RuntimeError("fixture server failed to start")
+    return proc, base_url
+
+
+def _git(*cmd: str) -> str:
+    try:
+        return subprocess.run(["git", *cmd], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else str(value)
+
+
+def _metric(entry: dict, path: tuple[str, ...]):
+    for key in path:
+        entry = entry.get(key) if isinstance(entry, dict) else None
+    return entry
+
+
+def print_report(results: dict) -> None:
+    print(f"\ncommit {results['commit'] or '?'}{' (dirty)' if results['dirty'] else ''}  engine {results['settings']['engine']}")
+    print(f"{'scenario':<18}" + "".join(f"{label:>14}" for _, label, _ in REPORTED) + f"{'errors':>8}")
+    for name, entry in results["scenarios"].items():
+        if "error" in entry:
+            print(f"{name:<18}  failed: {entry['error']}")
+            continue
+        row = "".join(f"{_fmt(_metric(entry, path)):>14}" for path, _, _ in REPORTED)
+        print(f"{name:<18}{row}{entry['errors']:>8}")
+    cold = results["scenarios"].get("cold_start")
+    if cold and "error" not in cold:
+        if cold["over_budget"]:
+            print(f"\nimport src.server: {cold['import_ms']} ms, over the {cold['import_budget_ms']} ms budget")
+        if cold["heavy_modules_loaded"]:
+            print(f"\nloaded before the first tool call: {', '.join(cold['heavy_modules_loaded'])}")
+
+
+def print_diff(old: dict, new: dict) -> None:
+    """Per-scenario change of each reported metric, new relative to old."""
+    print(f"\n{old['commit'] or '?'} -> {new['commit'] or '?'}")
+    print(f"{'scenario':<18}" + "".join(f"{label:>14}" for _, label, _ in REPORTED))
+    for name, entry in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if not before or "error" in before or "error" in entry:
+            continue
+        cells = []
+        for path, _, higher_is_better in REPORTED:
+            a, b = _metric(before, path), _metric(entry, path)
+            if not a or b is None or not isinstance(a, (int, float)):
+                cells.append(f"{'-':>14}")
+                continue
+            change = (b - a) / a * 100
+            worse = change < 0 if higher_is_better else change > 0
+            cells.append(f"{change:>+12.1f}%{'!' if worse and abs(change) >= 10 else ' '}")
+        print(f"{name:<18}" + "".join(cells))
+    print("(! = at least 10% worse)")
+
+
+def run(args) -> dict:
+    fixture, base_url = _start_fixture_server(args)
+    scenarios = {}
+    try:
+        for name in args.scenario or SCENARIOS:
+            with tempfile.TemporaryDirectory(prefix="turbo-bench-") as cache_dir:
+                cmd = [sys.executable, str(Path(__file__).resolve()), "--child", name,
+                       "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                       "--warmup", str(args.warmup), "--import-budget-ms", str(args.import_budget_ms)]
+                print(f"running {name} ...", file=sys.stderr, flush=True)
+                proc = subprocess.run(
+                    cmd, cwd=ROOT, env=_scenario_env(args, base_url, cache_dir),
+                    capture_output=True, text=True, timeout=args.timeout,
+                )
+            lines = proc.stdout.strip().splitlines()
+            if proc.returncode != 0 or not lines:
+                tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+                scenarios[name] = {"error": f"exit code {proc.returncode}: {tail}"}
+                continue
+            scenarios[name] = json.loads(lines[-1])
+    finally:
+        fixture.terminate()
+        fixture.wait()
+
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "engine": args.engine,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "warm_caches": args.warm,
+            "import_budget_ms": args.import_budget_ms,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only this scenario (repeatable)")
+    parser.add_argument("--requests", type=int, default=60, help="recorded requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=3, help="unrecorded requests before measuring")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fixture server response delay")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="fixture server delay spread")
+    parser.add_argument("--engine", choices=("http", "selenium"), default="http")
+    parser.add_argument("--warm", action="store_true", help="keep response/thumbnail caches enabled")
+    parser.add_argument("--import-budget-ms", type=float, default=1000.0, help="flag `import src.server` slower than this")
+    parser.add_argument("--timeout", type=float, default=600.0, help="seconds per scenario")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, metavar="OLD", help="compare this run against an earlier results file")
+    parser.add_argument("--diff", type=Path, nargs=2, metavar=("OLD", "NEW"), help="only compare two results files")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(args)
+        return
+    if args.diff:
+        old, new = (json.loads(p.read_text(encoding="utf-8")) for p in args.diff)
+        print_diff(old, new)
+        return
+
+    results = run(args)
+    output = args.output
+    if output is None:
+        name = (results["commit"] or "results") + ("-dirty" if results["dirty"] else "")
+        output = RESULTS_DIR / f"{name}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print_report(results)
+    print(f"\nresults written to {output}")
+    if args.compare:
+        print_diff(json.loads(args.compare.read_text(encoding="utf-8")), results)
+
+
+if __name__ == "__main__":
+    main()
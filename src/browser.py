@@ -0,0 +1,207 @@
+"""
+Turbo.az Browser
+Headless Chrome launch (chromedriver resolution, options) and the Selenium names
+used by the scraper's browser paths. Importing this module loads Selenium, so the
+scraper imports it only when a browser is actually needed.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException, WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+from .catalog import CACHE_DIR
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# WSL/Linux: Chrome binary path. Set CHROME_BINARY or install chromium in WSL.
+_CHROME_PATHS = (
+    os.environ.get("CHROME_BINARY"),
+    "/usr/bin/google-chrome",
+    "/usr/bin/google-chrome-stable",
+    "/usr/bin/chromium",
+    "/usr/bin/chromium-browser",
+)
+
+# Chromedriver executable. Unset: resolved by webdriver-manager once and remembered in the cache dir.
+CHROMEDRIVER_PATH = os.environ.get("TURBOAZ_CHROMEDRIVER") or os.environ.get("CHROMEDRIVER_PATH")
+_CHROMEDRIVER_PATH_FILE = CACHE_DIR / "chromedriver_path"
+_chromedriver_lock = threading.Lock()
+_chromedriver_path: Optional[str] = None
+
+# Lean profile: skip images, media, fonts and trackers; driver.get returns at DOMContentLoaded.
+# The scraper only reads DOM text and src attributes, which are present without the downloads.
+LEAN_BROWSER = os.environ.get("TURBOAZ_LEAN_BROWSER", "1") != "0"
+_BLOCKED_URLS = [
+    # Images and media
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    # Web fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.woff?*", "*.woff2?*", "*.ttf?*",
+    # Analytics and ads
+    "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*",
+    "*doubleclick.net*", "*adservice.google.*", "*facebook.net*", "*connect.facebook.*",
+    "*mc.yandex.ru*", "*yandex.ru/metrika*", "*hotjar.com*", "*clarity.ms*", "*tiktok.com*",
+    "*criteo.*", "*adriver.ru*", "*smartadserver.com*",
+]
+# Extra comma-separated URL patterns to block (Chrome wildcard syntax, e.g. "*.example.com*").
+BLOCKED_URLS = _BLOCKED_URLS + [p.strip() for p in os.environ.get("TURBOAZ_BLOCKED_URLS", "").split(",") if p.strip()]
+
+# Chrome profile dirs are named <prefix><owner pid>-<random> in the temp dir, so dirs of
+# processes that died without cleaning up can be told apart and removed.
+_PROFILE_PREFIX = "turboaz-chrome-"
+_sweep_lock = threading.Lock()
+_profiles_swept = False
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+PAGE_LOAD_TIMEOUT = 30
+
+
+def _find_chrome_binary() -> Optional[str]:
+    """Return first existing Chrome/Chromium binary path, or None."""
+    for path in _CHROME_PATHS:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def resolve_chromedriver(refresh: bool = False) -> str:
+    """
+    Chromedriver path: the configured one, else the one remembered from an earlier
+    run, else ChromeDriverManager().install() (may hit the network), then remembered.
+    refresh=True skips the remembered path (e.g. after a Chrome update made it stale).
+    """
+    global _chromedriver_path
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+    with _chromedriver_lock:
+        if _chromedriver_path and not refresh:
+            return _chromedriver_path
+        if not refresh:
+            try:
+                remembered = _CHROMEDRIVER_PATH_FILE.read_text(encoding="utf-8").strip()
+                if remembered and os.access(remembered, os.X_OK):
+                    _chromedriver_path = remembered
+                    return remembered
+            except OSError:
+                pass
+        path = ChromeDriverManager().install()
+        try:
+            _CHROMEDRIVER_PATH_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _CHROMEDRIVER_PATH_FILE.write_text(path, encoding="utf-8")
+        except OSError as e:
+            logger.warning("Could not remember chromedriver path: %s", e)
+        _chromedriver_path = path
+        return path
+
+
+def _sweep_stale_profiles() -> None:
+    """Removes profile dirs left behind by server processes that no longer run (once per process)."""
+    global _profiles_swept
+    with _sweep_lock:
+        if _profiles_swept:
+            return
+        _profiles_swept = True
+    tmp = tempfile.gettempdir()
+    try:
+        names = os.listdir(tmp)
+    except OSError:
+        return
+    for name in names:
+        if not name.startswith(_PROFILE_PREFIX):
+            continue
+        pid = name[len(_PROFILE_PREFIX):].split("-", 1)[0]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            os.kill(int(pid), 0)
+            continue
+        except ProcessLookupError:
+            pass
+        except OSError:
+            # Alive, owned by another user
+            continue
+        shutil.rmtree(os.path.join(tmp, name), ignore_errors=True)
+        logger.info("Removed stale Chrome profile %s", name)
+
+
+def launch_chrome():
+    """
+    Launches a new headless Chrome session with a fresh profile dir (driver.profile_dir);
+    quit it with quit_chrome() so the dir is removed.
+    """
+    _sweep_stale_profiles()
+    profile = tempfile.mkdtemp(prefix=f"{_PROFILE_PREFIX}{os.getpid()}-")
+    try:
+        driver = _start_chrome(profile)
+    except BaseException:
+        shutil.rmtree(profile, ignore_errors=True)
+        raise
+    driver.profile_dir = profile
+    return driver
+
+
+def quit_chrome(driver) -> None:
+    """Quits a session from launch_chrome() and deletes its profile dir."""
+    try:
+        driver.quit()
+    finally:
+        profile = getattr(driver, "profile_dir", None)
+        if profile:
+            shutil.rmtree(profile, ignore_errors=True)
+
+
+def _start_chrome(profile: str):
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-setuid-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-software-rasterizer")
+    options.add_argument("--remote-debugging-pipe")
+    options.add_argument(f"--user-data-dir={profile}")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    options.add_argument("--lang=az-AZ")
+    if LEAN_BROWSER:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    binary = _find_chrome_binary()
+    if binary:
+        options.binary_location = binary
+    try:
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=options)
+    except SessionNotCreatedException:
+        if CHROMEDRIVER_PATH:
+            raise
+        # Remembered chromedriver no longer matches the installed Chrome
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver(refresh=True)), options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    if LEAN_BROWSER:
+        _block_resources(driver)
+    return driver
+
+
+def _block_resources(driver) -> None:
+    """Blocks BLOCKED_URLS in the session's network layer (fonts, media and third-party hosts prefs cannot cover)."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except WebDriverException as e:
+        logger.warning("Could not set blocked URLs: %s", e.msg)
@@ -0,0 +1,310 @@
+"""
+Turbo.az Response Cache
+TTL + LRU cache for tool results with single-flight deduplication.
+Backends: in-process memory, or SQLite (WAL) shared by several server processes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from .catalog import CACHE_DIR
+from .executors import SHUTDOWN_TIMEOUT, Executor
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# "memory" (per process) or "sqlite" (shared file in TURBOAZ_CACHE_DIR).
+CACHE_BACKEND = os.environ.get("TURBOAZ_CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.environ.get("TURBOAZ_CACHE_MAX_ENTRIES", "1000"))
+CACHE_MAX_BYTES = int(os.environ.get("TURBOAZ_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Seconds a result stays fresh, per tool.
+DEFAULT_TTLS = {
+    "search_cars": float(os.environ.get("TURBOAZ_SEARCH_TTL", "300")),
+    "get_car_details": float(os.environ.get("TURBOAZ_DETAILS_TTL", "900")),
+    "get_trending": float(os.environ.get("TURBOAZ_TRENDING_TTL", "60")),
+}
+
+# SQLite backend: expired and least recently used rows are dropped once per this many writes,
+# and a hit refreshes a row's LRU time at most once per this many seconds.
+_EVICT_EVERY = 50
+_TOUCH_INTERVAL = 60.0
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class MemoryBackend:
+    """In-process LRU bounded by entry count and encoded size."""
+
+    # Fast enough to call on the event loop
+    blocking = False
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, size, value = entry
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        size = len(_encode(value).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._data[key] = (time.time() + ttl, size, value)
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, old_size, _) = self._data.popitem(last=False)
+            self._bytes -= old_size
+
+    def delete(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def usage(self) -> tuple[int, int]:
+        """(entries, bytes) currently held."""
+        return len(self._data), self._bytes
+
+
+class SqliteBackend:
+    """
+    LRU in a SQLite file (WAL mode), safe to share between processes. Calls may wait for
+    another process's write lock, so ResponseCache makes them off the event loop. The bounds
+    are enforced every _EVICT_EVERY writes, so they may be exceeded by that many entries.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: Path = CACHE_DIR / "responses.sqlite3",
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            # A write per hit would contend with other processes for little gain in LRU order
+            if now - row[2] >= _TOUCH_INTERVAL:
+                self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        encoded = _encode(value)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, encoded, size, now + ttl, now),
+                )
+                self._writes += 1
+                if self._writes % _EVICT_EVERY == 0:
+                    self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now: float) -> None:
+        """Drops expired rows, then least recently used ones until both bounds hold (inside a write transaction)."""
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+        stale = []
+        # Reads the accessed_at index only as far as needed
+        for old_key, old_size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((old_key,))
+            entries -= 1
+            total -= old_size
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", stale)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def usage(self) -> tuple[int, int]:
+        """(entries, bytes) currently held."""
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return entries, total
+
+
+def make_backend(name: str = CACHE_BACKEND):
+    """Backend by name: "memory" or "sqlite"."""
+    if name == "sqlite":
+        return SqliteBackend()
+    return MemoryBackend()
+
+
+class _Inflight:
+    """A fetch shared by the concurrent callers of one key."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class ResponseCache:
+    """Per-tool TTL cache in front of the scraper, sharing in-flight fetches of the same key."""
+
+    def __init__(self, backend=None, ttls: Optional[dict[str, float]] = None):
+        self.backend = backend if backend is not None else make_backend()
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._inflight: dict[str, _Inflight] = {}
+        # One thread: backend calls are short, but may wait for another process's write lock
+        self._executor = Executor("cache", 1) if self.backend.blocking else None
+
+    async def _call(self, fn: Callable[..., Any], *args) -> Any:
+        """A backend call, on the cache's own thread when it blocks."""
+        if self._executor is None:
+            return fn(*args)
+        return await self._executor.run(fn, *args)
+
+    async def get_or_fetch(self, tool: str, key: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Cached result of a tool call, or the result of fetch() (stored if successful).
+        Concurrent callers with the same key await one fetch, which runs until it is done
+        or the last of them is cancelled.
+        """
+        full_key = f"{tool}:{key}"
+        try:
+            cached = await self._call(self.backend.get, full_key)
+        except sqlite3.Error as e:
+            logger.warning("Cache read failed: %s", e)
+            cached = None
+        if cached is not None:
+            self.hits += 1
+            CACHE_REQUESTS.inc(tool=tool, result="hit")
+            return cached
+
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            self.shared += 1
+            CACHE_REQUESTS.inc(tool=tool, result="shared")
+        else:
+            self.misses += 1
+            CACHE_REQUESTS.inc(tool=tool, result="miss")
+            # A task of its own, so a caller that gives up does not take the fetch from the others
+            inflight = self._inflight[full_key] = _Inflight(asyncio.ensure_future(self._fetch(tool, full_key, fetch)))
+            inflight.task.add_done_callback(lambda task: self._fetched(full_key, task))
+        inflight.waiters += 1
+        try:
+            return await asyncio.shield(inflight.task)
+        except asyncio.CancelledError:
+            # Nobody is left waiting for it; later callers start a fetch of their own
+            if inflight.waiters == 1:
+                inflight.task.cancel()
+                if self._inflight.get(full_key) is inflight:
+                    del self._inflight[full_key]
+            raise
+        finally:
+            inflight.waiters -= 1
+
+    async def _fetch(self, tool: str, full_key: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        result = await fetch()
+        if isinstance(result, dict) and result.get("success"):
+            try:
+                await self._call(self.backend.set, full_key, result, self.ttls.get(tool, 60.0))
+            except sqlite3.Error as e:
+                logger.warning("Cache write failed: %s", e)
+        return result
+
+    def _fetched(self, full_key: str, task: asyncio.Task) -> None:
+        inflight = self._inflight.get(full_key)
+        if inflight is not None and inflight.task is task:
+            del self._inflight[full_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller had given up
+
+    async def put(self, tool: str, key: str, result: dict) -> None:
+        """Stores a result fetched outside get_or_fetch (e.g. a background refresh), replacing the cached one."""
+        try:
+            await self._call(self.backend.set, f"{tool}:{key}", result, self.ttls.get(tool, 60.0))
+        except sqlite3.Error as e:
+            logger.warning("Cache write failed: %s", e)
+
+    async def invalidate(self, tool: str, key: str) -> None:
+        """Drops the cached result of one tool call (e.g. the listing is known to have changed)."""
+        try:
+            await self._call(self.backend.delete, f"{tool}:{key}")
+        except sqlite3.Error as e:
+            logger.warning("Cache delete failed: %s", e)
+
+    async def stats(self) -> dict:
+        """Hit/miss counters and backend usage."""
+        entries, size = await self._call(self.backend.usage)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    async def close(self, timeout: float = SHUTDOWN_TIMEOUT) -> None:
+        """Lets a running backend call finish (up to `timeout` seconds) and stops the cache thread."""
+        if self._executor is not None:
+            await self._executor.shutdown(timeout)
@@ -0,0 +1,202 @@
+"""
+Turbo.az Make/Model Catalog
+On-disk catalog of make and model IDs with in-memory lookup indexes,
+so search URLs can be built without opening the search form.
+"""
+
+import bisect
+import difflib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# Directory for on-disk state (catalog, caches).
+CACHE_DIR = Path(os.environ.get("TURBOAZ_CACHE_DIR") or Path.home() / ".cache" / "turbo-az-mcp")
+CATALOG_PATH = CACHE_DIR / "catalog.json"
+# Seconds after which a make or model list is refreshed in the background.
+CATALOG_TTL = float(os.environ.get("TURBOAZ_CATALOG_TTL", "86400"))
+# Minimum similarity for fuzzy matches ("mersedes" -> "Mercedes").
+FUZZY_CUTOFF = 0.8
+
+
+class OptionIndex:
+    """Lookup index over one dropdown's (id, label) options, in site order."""
+
+    def __init__(self, options: list[tuple[str, str]]):
+        self.options = [(str(val), label) for val, label in options]
+        self._exact: dict[str, str] = {}
+        for val, label in self.options:
+            self._exact.setdefault(label.lower(), val)
+        # (lowercase label, site position) sorted by label, for prefix ranges.
+        self._sorted = sorted((label.lower(), pos) for pos, (_, label) in enumerate(self.options))
+        self._keys = [key for key, _ in self._sorted]
+
+    def labels(self) -> list[str]:
+        """Option labels in site order."""
+        return [label for _, label in self.options]
+
+    def exact(self, name: str) -> Optional[str]:
+        """ID of the option labelled exactly `name` (case-insensitive)."""
+        return self._exact.get(name.strip().lower())
+
+    def prefix(self, prefix: str) -> Optional[str]:
+        """ID of the first option (site order) whose label starts with `prefix`."""
+        prefix = prefix.lower()
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + "\uffff")
+        if lo >= hi:
+            return None
+        pos = min(p for _, p in self._sorted[lo:hi])
+        return self.options[pos][0]
+
+    def contains(self, name: str) -> Optional[str]:
+        """ID of the first option whose label contains `name`."""
+        name = name.strip().lower()
+        for val, label in self.options:
+            if name in label.lower():
+                return val
+        return None
+
+    def fuzzy(self, name: str) -> Optional[str]:
+        """ID of the closest label by similarity, if close enough."""
+        match = difflib.get_close_matches(name.strip().lower(), self._keys, n=1, cutoff=FUZZY_CUTOFF)
+        return self._exact[match[0]] if match else None
+
+
+class MakeModelCatalog:
+    """Make -> ID and (make, model) -> ID catalog persisted as JSON."""
+
+    def __init__(self, path: Path = CATALOG_PATH, ttl: float = CATALOG_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.makes: Optional[OptionIndex] = None
+        self.makes_fetched_at = 0.0
+        self.models: dict[str, OptionIndex] = {}
+        self.models_fetched_at: dict[str, float] = {}
+        # mtime of the file as last read or written, to notice updates by other processes
+        self._mtime: Optional[float] = None
+        self._load()
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> None:
+        """Re-reads the file when another process (e.g. a sibling HTTP worker) has rewritten it."""
+        mtime = self._file_mtime()
+        if mtime is not None and mtime != self._mtime:
+            self._load()
+
+    def _load(self) -> None:
+        """Reads the catalog file if present; a corrupt file is ignored."""
+        self._mtime = self._file_mtime()
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable catalog %s: %s", self.path, e)
+            return
+        makes = data.get("makes") or {}
+        if makes.get("options"):
+            self.makes = OptionIndex(makes["options"])
+            self.makes_fetched_at = makes.get("fetched_at", 0.0)
+        for make_id, entry in (data.get("models") or {}).items():
+            self.models[make_id] = OptionIndex(entry.get("options") or [])
+            self.models_fetched_at[make_id] = entry.get("fetched_at", 0.0)
+
+    def save(self) -> None:
+        """Writes the catalog atomically (temp file + rename)."""
+        data = {
+            "makes": {
+                "fetched_at": self.makes_fetched_at,
+                "options": self.makes.options if self.makes else [],
+            },
+            "models": {
+                make_id: {"fetched_at": self.models_fetched_at.get(make_id, 0.0), "options": index.options}
+                for make_id, index in self.models.items()
+            },
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".catalog-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._mtime = self._file_mtime()
+        except OSError as e:
+            logger.warning("Could not save catalog %s: %s", self.path, e)
+
+    def has_makes(self) -> bool:
+        return self.makes is not None
+
+    def has_models(self, make_id: str) -> bool:
+        return str(make_id) in self.models
+
+    def set_makes(self, options: list[tuple[str, str]]) -> None:
+        """Replaces the make list (ignored when empty, e.g. a broken page)."""
+        if not options:
+            return
+        self.makes = OptionIndex(options)
+        self.makes_fetched_at = time.time()
+        self.save()
+
+    def set_models(self, make_id: str, options: list[tuple[str, str]]) -> None:
+        """Replaces the model list of one make (ignored when empty, e.g. a dropdown that did not load)."""
+        if not options:
+            return
+        make_id = str(make_id)
+        self.models[make_id] = OptionIndex(options)
+        self.models_fetched_at[make_id] = time.time()
+        self.save()
+
+    def make_labels(self) -> list[str]:
+        return self.makes.labels() if self.makes else []
+
+    def model_labels(self, make_id: str) -> list[str]:
+        index = self.models.get(str(make_id))
+        return index.labels() if index else []
+
+    def find_make(self, name: str) -> Optional[str]:
+        """Make ID by exact name, then prefix, then substring, then fuzzy match."""
+        if not self.makes or not name.strip():
+            return None
+        return (
+            self.makes.exact(name)
+            or self.makes.prefix(name.strip())
+            or self.makes.contains(name)
+            or self.makes.fuzzy(name)
+        )
+
+    def find_model(self, make_id: str, name: str) -> Optional[str]:
+        """
+        Model ID by exact name, then a variant of it ("X5 M", "X5 (E70)"). No fuzzy match:
+        model names differ by a character ("C 200", "C 220"), so a near miss is another model.
+        Returns None when not found or when the make's models are not loaded.
+        """
+        index = self.models.get(str(make_id))
+        if not index or not name.strip():
+            return None
+        return (
+            index.exact(name)
+            or index.prefix(name.strip() + " ")
+            or index.prefix(name.strip() + "(")
+        )
+
+    def stale_makes(self) -> list[str]:
+        """Make IDs whose model lists are older than the TTL."""
+        now = time.time()
+        return [m for m, ts in self.models_fetched_at.items() if now - ts >= self.ttl]
+
+    def seconds_until_stale(self) -> float:
+        """Seconds until the oldest list in the catalog needs a refresh (0 if due)."""
+        stamps = [self.makes_fetched_at] + list(self.models_fetched_at.values())
+        return max(0.0, min(stamps) + self.ttl - time.time())
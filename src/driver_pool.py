@@ -0,0 +1,374 @@
+"""
+Turbo.az WebDriver Pool
+Bounded pool of headless Chrome sessions shared by scraper calls, with liveness
+probes, recycling by page count and memory, and cleanup at exit.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from .metrics import DRIVER_RESTARTS, DRIVER_STARTS, span
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# Number of Chrome sessions that may run at once.
+POOL_SIZE = int(os.environ.get("TURBOAZ_POOL_SIZE", "2"))
+# A session is recycled (quit and relaunched) after this many page loads.
+MAX_PAGES_PER_DRIVER = int(os.environ.get("TURBOAZ_MAX_PAGES", "200"))
+# Seconds a caller waits for a free session before giving up.
+CHECKOUT_TIMEOUT = float(os.environ.get("TURBOAZ_CHECKOUT_TIMEOUT", "60"))
+# A session is recycled once chromedriver, Chrome and its child processes together hold
+# more than this many MB resident (Linux /proc; 0 = no limit). Checked by sweep() on idle sessions.
+MAX_RSS_MB = float(os.environ.get("TURBOAZ_MAX_RSS_MB", "1024"))
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+# Pools with sessions that may outlive them at interpreter exit; weak, so a dropped pool can be freed.
+_POOLS: "weakref.WeakSet[DriverPool]" = weakref.WeakSet()
+
+
+def _at_exit() -> None:
+    """Fallback for exits that skip the servers' shutdown (no Chrome or profile dir left behind)."""
+    for pool in list(_POOLS):
+        pool.abort_all()
+        pool.close()
+
+
+atexit.register(_at_exit)
+
+
+class PoolTimeout(Exception):
+    """Raised when no driver becomes available within the checkout timeout."""
+
+
+class SessionCrashed(Exception):
+    """Raised by DriverPool.driver() when the session died during the call (it has been discarded)."""
+
+
+def _process_table() -> Optional[tuple[dict[int, list[int]], dict[int, int]]]:
+    """(pid -> child pids, pid -> resident bytes) of all processes (Linux /proc), or None."""
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    children: dict[int, list[int]] = {}
+    rss: dict[int, int] = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the "(comm)" field: state, ppid, ...; rss (in pages) is field 24 of stat
+        fields = stat[stat.rfind(b")") + 2:].split()
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)
+        rss[pid] = int(fields[21]) * _PAGE_SIZE
+    return children, rss
+
+
+def process_tree_rss(root_pid: int, table: Optional[tuple[dict[int, list[int]], dict[int, int]]] = None) -> Optional[int]:
+    """
+    Summed resident memory in bytes of a process and all its descendants (Linux /proc), or None.
+    Pass a _process_table() to measure several trees with one scan of /proc.
+    """
+    table = table or _process_table()
+    if table is None:
+        return None
+    children, rss = table
+    if root_pid not in rss:
+        return None
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+class _Slot:
+    """One pooled Chrome session and its usage counters."""
+
+    __slots__ = ("driver", "pages", "created_at", "aborted")
+
+    def __init__(self, driver) -> None:
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+        self.aborted = False
+
+
+class DriverPool:
+    """Thread-safe pool of WebDriver sessions with checkout/checkin semantics."""
+
+    def __init__(
+        self,
+        factory: Callable[[], object],
+        size: int = POOL_SIZE,
+        max_pages: int = MAX_PAGES_PER_DRIVER,
+        checkout_timeout: float = CHECKOUT_TIMEOUT,
+        dispose: Optional[Callable[[object], None]] = None,
+        max_rss_mb: float = MAX_RSS_MB,
+    ):
+        """
+        Args:
+            factory: Callable that launches and returns a new WebDriver.
+            size: Maximum number of live sessions.
+            max_pages: Page loads after which a session is recycled.
+            checkout_timeout: Seconds to wait for a free session.
+            dispose: Callable that quits a WebDriver and cleans up after it (default: driver.quit()).
+            max_rss_mb: Resident memory of a session's process tree after which it is recycled (0 = off).
+        """
+        self._factory = factory
+        self._dispose = dispose or (lambda driver: driver.quit())
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_rss = int(max_rss_mb * 1024 * 1024)
+        self.checkout_timeout = checkout_timeout
+        self._idle: list[_Slot] = []
+        self._busy: dict[int, _Slot] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        _POOLS.add(self)
+
+    @property
+    def live(self) -> int:
+        """Number of sessions currently alive (idle + checked out)."""
+        with self._cond:
+            return len(self._idle) + len(self._busy)
+
+    def _is_healthy(self, driver) -> bool:
+        """Cheap liveness probe: ask the session for its current URL."""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, slot: _Slot) -> None:
+        """Quit a session, ignoring errors from an already dead browser."""
+        try:
+            self._dispose(slot.driver)
+        except Exception as e:
+            logger.debug("Driver quit error: %s", e)
+
+    def _over_rss(self, driver, table) -> bool:
+        """True when the session's process tree is over the memory budget."""
+        process = getattr(getattr(driver, "service", None), "process", None)
+        rss = process_tree_rss(process.pid, table) if process is not None else None
+        if rss is not None and rss > self.max_rss:
+            logger.info("Recycling browser using %d MB", rss // (1024 * 1024))
+            return True
+        return False
+
+    def acquire(self, timeout: Optional[float] = None) -> object:
+        """
+        Check out a healthy driver, launching a new one if the pool has room.
+        Raises:
+            PoolTimeout: no session became free within the timeout.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            create = False
+            with self._cond, span("driver_wait"):
+                while not self._idle and len(self._busy) >= self.size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No browser available after {timeout:g}s")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    slot = self._idle.pop()
+                    self._busy[id(slot.driver)] = slot
+                else:
+                    # Reserve the seat before launching Chrome outside the lock.
+                    slot = _Slot(None)
+                    self._busy[id(slot)] = slot
+                    create = True
+            if create:
+                try:
+                    with span("driver_start"):
+                        driver = self._factory()
+                    DRIVER_STARTS.inc()
+                except BaseException:
+                    with self._cond:
+                        self._busy.pop(id(slot), None)
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._busy.pop(id(slot), None)
+                    slot.driver = driver
+                    self._busy[id(driver)] = slot
+                return driver
+            if self._is_healthy(slot.driver):
+                return slot.driver
+            logger.warning("Discarding unhealthy browser session")
+            self.release(slot.driver, discard=True)
+
+    def prewarm(self, count: Optional[int] = None, prepare: Optional[Callable[[object], None]] = None) -> int:
+        """
+        Launch idle sessions until `count` (default: the pool size) are alive,
+        so early checkouts do not wait for Chrome startup.
+        prepare(driver) runs on each new session before it becomes available; its errors are logged.
+        Returns:
+            Number of sessions launched.
+        """
+        target = self.size if count is None else min(count, self.size)
+        launched = 0
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) + len(self._busy) >= target:
+                    return launched
+                slot = _Slot(None)
+                self._busy[id(slot)] = slot
+            try:
+                with span("driver_start"):
+                    slot.driver = self._factory()
+                DRIVER_STARTS.inc()
+                if prepare is not None:
+                    try:
+                        prepare(slot.driver)
+                    except Exception as e:
+                        logger.warning("Browser warm-up step failed: %s", e)
+            finally:
+                with self._cond:
+                    self._busy.pop(id(slot), None)
+                    keep = slot.driver is not None and not self._closed
+                    if keep:
+                        self._idle.append(slot)
+                    self._cond.notify()
+                if slot.driver is not None and not keep:
+                    self._quit(slot)
+            launched += 1
+
+    def release(self, driver, discard: bool = False, reason: str = "discarded") -> bool:
+        """
+        Return a driver to the pool; quit it if discarded, aborted, closed or worn out (pages).
+        Memory use is checked by sweep(), not here. `reason` labels a discard in the metrics.
+        Returns:
+            True if the session was retired.
+        """
+        with self._cond:
+            slot = self._busy.pop(id(driver), None)
+            if slot is None:
+                return False
+            retire = discard or slot.aborted or self._closed or slot.pages >= self.max_pages
+            reason = (
+                "aborted" if slot.aborted else reason if discard else "closed" if self._closed else "max_pages"
+            )
+            if not retire:
+                self._idle.append(slot)
+            elif self._closed and not self._busy:
+                # Last session of a closed pool: nothing left for the exit handler
+                _POOLS.discard(self)
+            self._cond.notify()
+        if retire:
+            DRIVER_RESTARTS.inc(reason=reason)
+            if slot.pages >= self.max_pages:
+                logger.info("Recycling browser after %d pages", slot.pages)
+            self._quit(slot)
+        return retire
+
+    def abort(self, driver) -> None:
+        """
+        Kills a checked-out session's chromedriver from any thread, so a command blocked in it
+        (e.g. driver.get) fails at once instead of running to its own timeout. Chrome exits
+        with it (it is attached over --remote-debugging-pipe); the slot is retired on release.
+        """
+        with self._cond:
+            slot = self._busy.get(id(driver))
+            if slot is None or slot.aborted:
+                return
+            slot.aborted = True
+        # driver.quit() would queue behind the blocked command, so stop the process directly
+        process = getattr(getattr(driver, "service", None), "process", None)
+        if process is not None:
+            try:
+                process.kill()
+            except OSError as e:
+                logger.debug("Driver kill error: %s", e)
+        logger.warning("Aborted a busy browser session")
+
+    def abort_all(self) -> None:
+        """abort() for every checked-out session (shutdown with calls still running)."""
+        with self._cond:
+            drivers = [slot.driver for slot in self._busy.values() if slot.driver is not None]
+        for driver in drivers:
+            self.abort(driver)
+
+    def mark_page(self, driver) -> None:
+        """Count one page load against a checked-out driver."""
+        with self._cond:
+            slot = self._busy.get(id(driver))
+            if slot is not None:
+                slot.pages += 1
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None) -> Iterator[object]:
+        """
+        Context manager: check out a driver, discard it if the browser crashed.
+        Raises:
+            SessionCrashed: a WebDriverException left the session dead.
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        drv = self.acquire(timeout)
+        discard = False
+        try:
+            yield drv
+        except WebDriverException as e:
+            discard = not self._is_healthy(drv)
+            if discard:
+                raise SessionCrashed(e.msg or type(e).__name__) from e
+            raise
+        finally:
+            self.release(drv, discard=discard)
+
+    def sweep(self) -> int:
+        """
+        Liveness probe of the idle sessions: retires dead ones and those over the memory budget
+        (one scan of /proc for all of them).
+        Returns:
+            Number of sessions retired.
+        """
+        with self._cond:
+            # Checked out while probed, so no caller gets one mid-probe
+            idle, self._idle = self._idle, []
+            for slot in idle:
+                self._busy[id(slot.driver)] = slot
+        table = _process_table() if self.max_rss and idle else None
+        retired = 0
+        for slot in idle:
+            if not self._is_healthy(slot.driver):
+                logger.warning("Discarding dead idle browser session")
+                retired += self.release(slot.driver, discard=True)
+            elif table is not None and self._over_rss(slot.driver, table):
+                retired += self.release(slot.driver, discard=True, reason="rss")
+            else:
+                retired += self.release(slot.driver)
+        return retired
+
+    def close(self) -> None:
+        """Quit all idle sessions; busy ones are quit when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            if not self._busy:
+                _POOLS.discard(self)
+            self._cond.notify_all()
+        for slot in idle:
+            self._quit(slot)
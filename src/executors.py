@@ -0,0 +1,129 @@
+"""
+Turbo.az Executors
+Dedicated thread pools in place of the event loop's default executor: one for
+blocking browser work (sized to the driver pool, owned by the scraper) and one
+shared by CPU-bound HTML parsing, image processing and local index reads and writes.
+Each reports its threads, busy threads, queued jobs and busy time as metrics.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from typing import Callable, TypeVar
+
+from .metrics import EXECUTOR_BUSY, EXECUTOR_BUSY_SECONDS, EXECUTOR_JOBS, EXECUTOR_QUEUED, EXECUTOR_THREADS
+
+logger = logging.getLogger("turbo-az-mcp")
+
+T = TypeVar("T")
+
+# Threads for parsing, image decode/resize/encode and index reads and writes (these release the GIL
+# for much of their work). TURBOAZ_IMAGE_WORKERS is the older name of the setting.
+CPU_WORKERS = int(os.environ.get(
+    "TURBOAZ_CPU_WORKERS", os.environ.get("TURBOAZ_IMAGE_WORKERS", str(min(4, os.cpu_count() or 1)))
+))
+# Seconds shutdown waits for running jobs.
+SHUTDOWN_TIMEOUT = float(os.environ.get("TURBOAZ_SHUTDOWN_TIMEOUT", "10"))
+
+
+class Executor:
+    """Named ThreadPoolExecutor with utilization accounting; run() is awaited from the event loop."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"turbo-{name}")
+        self._lock = threading.Lock()
+        self._running: set[concurrent.futures.Future] = set()
+        self._queued = 0
+        self._busy = 0
+        self._completed = 0
+        self._busy_seconds = 0.0
+        self._started = time.monotonic()
+        EXECUTOR_THREADS.set(self.workers, executor=name)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """
+        fn(*args) in one of the pool's threads. Cancelling the caller drops a job
+        that has not started; a running one finishes (or must be aborted by its owner).
+        Raises:
+            RuntimeError: the executor was shut down.
+        """
+        with self._lock:
+            self._queued += 1
+        EXECUTOR_QUEUED.inc(executor=self.name)
+        try:
+            future = self._pool.submit(self._job, fn, args)
+        except RuntimeError:
+            self._dequeue()
+            raise
+        with self._lock:
+            self._running.add(future)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _dequeue(self) -> None:
+        with self._lock:
+            self._queued -= 1
+        EXECUTOR_QUEUED.dec(executor=self.name)
+
+    def _job(self, fn: Callable[..., T], args: tuple) -> T:
+        self._dequeue()
+        with self._lock:
+            self._busy += 1
+        EXECUTOR_BUSY.inc(executor=self.name)
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._busy -= 1
+                self._completed += 1
+                self._busy_seconds += elapsed
+            EXECUTOR_BUSY.dec(executor=self.name)
+            EXECUTOR_BUSY_SECONDS.inc(elapsed, executor=self.name)
+
+    def _done(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._running.discard(future)
+        if future.cancelled():
+            # Never started, so _job did not take it off the queue
+            self._dequeue()
+            outcome = "cancelled"
+        else:
+            outcome = "error" if future.exception() is not None else "ok"
+        EXECUTOR_JOBS.inc(executor=self.name, outcome=outcome)
+
+    def stats(self) -> dict:
+        """Threads, busy threads, queued and completed jobs, and utilization (busy share of thread time) since start."""
+        with self._lock:
+            busy_seconds = self._busy_seconds
+            stats = {"workers": self.workers, "busy": self._busy, "queued": self._queued, "completed": self._completed}
+        stats["busy_seconds"] = round(busy_seconds, 3)
+        stats["utilization"] = round(busy_seconds / (self.workers * max(time.monotonic() - self._started, 1e-9)), 4)
+        return stats
+
+    async def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT) -> int:
+        """
+        Drops queued jobs and waits up to `timeout` seconds for running ones.
+        Returns:
+            number of jobs still running afterwards.
+        """
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                left = sum(1 for f in self._running if not f.done())
+            if not left or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.05)
+        logger.info("Executor %s shut down: %s", self.name, self.stats())
+        return left
+
+
+# Shared by the scraper's parsers, the image pipeline, index writes and index/history queries of this process.
+CPU_EXECUTOR = Executor("cpu", CPU_WORKERS)
@@ -0,0 +1,111 @@
+"""
+Turbo.az DOM Extractors
+JavaScript run via `driver.execute_script` so the Selenium path reads a whole
+page in one WebDriver round trip. Each script returns JSON-compatible data in
+the same shape the scraper returns.
+"""
+
+# Shared helper: visible text like Selenium's `.text`, trimmed.
+_TEXT_FN = """
+function txt(el) {
+    if (!el) return "";
+    return (el.innerText || el.textContent || "").trim();
+}
+"""
+
+# arguments[0]: dropdown data-id (q_make, q_model). Returns [[val, label], ...].
+DROPDOWN_OPTIONS_JS = _TEXT_FN + """
+var container = document.querySelector('.tz-dropdown[data-id="' + arguments[0] + '"]');
+if (!container) return [];
+var out = [];
+container.querySelectorAll(".tz-dropdown__list .tz-dropdown__option").forEach(function (el) {
+    var val = (el.getAttribute("data-val") || "").trim();
+    if (!val) return;
+    var cls = el.getAttribute("class") || "";
+    if (cls.indexOf("tz-dropdown__option--reset") >= 0 || cls.indexOf("tz-dropdown__option--not-found") >= 0 || cls.indexOf("is-hidden") >= 0) return;
+    var labelEl = el.querySelector(".tz-dropdown__option-label .text") || el.querySelector(".tz-dropdown__option-label");
+    var label = txt(labelEl);
+    if (label) out.push([val, label]);
+});
+return out;
+"""
+
+# arguments[0]: max cards (limit; null = all). Returns {results: [...], total_count: str|null}.
+SEARCH_RESULTS_JS = _TEXT_FN + """
+var limit = arguments[0];
+var results = [];
+var items = Array.prototype.slice.call(document.getElementsByClassName("products-i"), 0, limit == null ? undefined : limit);
+items.forEach(function (item) {
+    var link = item.querySelector(".products-i__link");
+    if (!link || !link.href) return;
+    var car = {};
+    car.url = link.href;
+    car.id = car.url.split("/").pop().split("-")[0];
+    var img = item.querySelector(".products-i__top img");
+    car.image = img ? (img.src || null) : null;
+    var title = item.querySelector(".products-i__name");
+    car.title = title ? txt(title) : "N/A";
+    var price = item.querySelector(".products-i__price");
+    car.price = price ? txt(price) : "N/A";
+    var attrs = item.querySelector(".products-i__attributes");
+    if (attrs) {
+        var parts = txt(attrs).split(",").map(function (p) { return p.trim(); });
+        if (parts.length >= 1) car.year = parts[0];
+        if (parts.length >= 2) car.engine = parts[1];
+        if (parts.length >= 3) car.mileage = parts[2];
+    }
+    var loc = item.querySelector(".products-i__datetime");
+    if (loc) {
+        var locText = txt(loc);
+        var i = locText.indexOf(",");
+        if (i >= 0) {
+            car.city = locText.slice(0, i).trim();
+            car.date = locText.slice(i + 1).trim();
+        } else {
+            car.city = locText;
+        }
+    }
+    results.push(car);
+});
+var count = document.querySelector(".products-title__amount") || document.querySelector(".products-title__count");
+return {results: results, total_count: count ? txt(count) : null};
+"""
+
+# arguments[0]: listing URL. Returns the get_car_details "details" dict.
+DETAILS_JS = _TEXT_FN + """
+var details = {url: arguments[0]};
+var title = document.querySelector(".product-title");
+details.title = title ? txt(title) : "N/A";
+var price = document.querySelector(".product-price__i--bold") || document.querySelector(".product-price__i");
+details.price = price ? txt(price) : "N/A";
+details.images = [];
+document.querySelectorAll(".product-photos__slider-top-i img").forEach(function (img) {
+    if (img.getAttribute("src")) details.images.push(img.src);
+});
+details.specs = {};
+document.querySelectorAll(".product-properties__i").forEach(function (prop) {
+    var label = prop.querySelector(".product-properties__i-name");
+    var value = prop.querySelector(".product-properties__i-value");
+    if (label && value) details.specs[txt(label)] = txt(value);
+});
+details.description = txt(document.querySelector(".product-description__content"));
+var seller = document.querySelector(".product-owner__info-name");
+if (seller) details.seller_name = txt(seller);
+var region = document.querySelector(".product-owner__info-region");
+if (region) details.city = txt(region);
+details.phones = [];
+document.querySelectorAll(".product-phones__i a, .js-phones-hidden-block a").forEach(function (p) {
+    var t = txt(p);
+    if (t) details.phones.push(t);
+});
+document.querySelectorAll(".product-statistics__i .product-statistics__i-text").forEach(function (s) {
+    var t = txt(s);
+    var lower = t.toLowerCase();
+    if (t.indexOf("Yeniləndi:") >= 0 || lower.indexOf("yeniləndi") >= 0) {
+        details.posted_date = t;
+    } else if (t.indexOf("Baxışların") >= 0 || lower.indexOf("baxış") >= 0) {
+        details.views = t;
+    }
+});
+return details;
+"""
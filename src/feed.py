@@ -0,0 +1,199 @@
+"""
+Turbo.az Change Feed
+Incremental crawler over the newest listings: reads result pages until one holds
+nothing new or changed, fetches details only for the listings that are, and
+serves the listing index's change log to get_new_since callers.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Optional
+
+from .executors import CPU_EXECUTOR
+from .scheduler import background
+
+if TYPE_CHECKING:
+    from .index import ListingIndex
+    from .scraper import TurboAzScraper
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# Seconds between background crawls (0 = only crawl when get_new_since finds the feed stale).
+FEED_INTERVAL = float(os.environ.get("TURBOAZ_FEED_INTERVAL", "0"))
+# get_new_since crawls first when the last crawl is older than this many seconds.
+FEED_MAX_AGE = float(os.environ.get("TURBOAZ_FEED_MAX_AGE", "60"))
+# Max result pages one crawl reads (newest first).
+FEED_MAX_PAGES = int(os.environ.get("TURBOAZ_FEED_MAX_PAGES", "10"))
+# Max detail pages one crawl fetches for new or changed listings.
+FEED_MAX_DETAILS = int(os.environ.get("TURBOAZ_FEED_MAX_DETAILS", "20"))
+# Seconds change log entries are kept.
+FEED_RETENTION = float(os.environ.get("TURBOAZ_FEED_RETENTION", str(7 * 86400)))
+# Max listings per get_new_since call.
+MAX_FEED_LIMIT = 200
+
+
+def _encode_cursor(seq: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"s": seq}).encode()).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> int:
+    """Change log sequence number of a cursor. Raises ValueError when invalid."""
+    try:
+        seq = int(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["s"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if seq < 0:
+        raise ValueError("Invalid cursor")
+    return seq
+
+
+class ChangeFeed:
+    """Crawls the newest listings incrementally; the index decides what is new or changed."""
+
+    def __init__(
+        self,
+        scraper: "TurboAzScraper",
+        index: "ListingIndex",
+        interval: float = FEED_INTERVAL,
+        max_pages: int = FEED_MAX_PAGES,
+        max_details: int = FEED_MAX_DETAILS,
+    ):
+        self.scraper = scraper
+        self.index = index
+        self.interval = interval
+        self.max_pages = max_pages
+        self.max_details = max_details
+        self.last_crawl = 0.0
+        self.last_stats: dict = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def crawl(self) -> dict:
+        """
+        One incremental pass: result pages newest first until a page has no new or
+        changed listing, then fresh details of those listings (at most max_details).
+        Returns:
+            pass statistics (pages read, new, updated, details fetched, seconds).
+        Fetches queue at the caller's priority (background() in the periodic loop).
+        """
+        async with self._lock:
+            return await self._crawl()
+
+    async def crawl_if_stale(self, max_age: float = FEED_MAX_AGE) -> None:
+        """
+        Crawls unless a pass finished within `max_age` seconds (concurrent callers share one pass).
+        A get_new_since call waits for this pass, so its fetches keep the caller's priority.
+        """
+        async with self._lock:
+            if time.time() - self.last_crawl >= max_age:
+                await self._crawl()
+
+    async def _crawl(self) -> dict:
+        from .scraper import DETAILS_BATCH_CONCURRENCY, _page_url
+
+        start = time.perf_counter()
+        url = self.scraper._build_search_url()
+        changed: dict[str, str] = {}
+        urls: dict[str, str] = {}
+        pages = 0
+        complete = True
+        for page in range(1, self.max_pages + 1):
+            seq = await CPU_EXECUTOR.run(self.index.head)
+            # Not through the response cache: the point is to see the page as it is now
+            result = await self.scraper._scrape_search(_page_url(url, page), None)
+            pages += 1
+            if not result.get("success"):
+                logger.warning("Change feed: page %d failed: %s", page, result.get("error"))
+                break
+            cards = result["results"]
+            if not cards:
+                # A fetched page without cards means the page was not read right (the newest
+                # listings never run out), not that nothing is new: try again on the next pass
+                logger.warning("Change feed: page %d has no listings", page)
+                complete = False
+                break
+            page_ids = {car["id"] for car in cards}
+            page_changes = {
+                listing_id: kind
+                for listing_id, kind in (await CPU_EXECUTOR.run(self.index.changed_ids, seq)).items()
+                if listing_id in page_ids
+            }
+            for car in cards:
+                if car["id"] in page_changes and car["id"] not in changed:
+                    changed[car["id"]] = page_changes[car["id"]]
+                    urls[car["id"]] = car["url"]
+            # Known territory: everything on this page was already seen as it is
+            if not page_changes:
+                break
+
+        targets = list(changed)[:self.max_details]
+        semaphore = asyncio.Semaphore(max(1, DETAILS_BATCH_CONCURRENCY))
+
+        async def _details(listing_id: str) -> bool:
+            async with semaphore:
+                await self.scraper.cache.invalidate("get_car_details", listing_id)
+                result = await self.scraper._scrape_details(urls[listing_id])
+            return bool(result.get("success"))
+
+        fetched = sum(await asyncio.gather(*(_details(lid) for lid in targets)))
+        await CPU_EXECUTOR.run(self.index.trim_changes, time.time() - FEED_RETENTION)
+        if complete:
+            self.last_crawl = time.time()
+        self.last_stats = {
+            "pages": pages,
+            "new": sum(1 for kind in changed.values() if kind == "new"),
+            "updated": sum(1 for kind in changed.values() if kind == "updated"),
+            "details_fetched": fetched,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info("Change feed crawl: %s", self.last_stats)
+        return self.last_stats
+
+    async def get_new_since(self, cursor: Optional[str] = None, limit: int = 50) -> dict:
+        """
+        Listings new or changed after `cursor` (a next_cursor from an earlier call;
+        omitted: everything in the change log). Crawls first when the feed is stale.
+        """
+        try:
+            seq = _decode_cursor(cursor) if cursor else 0
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        try:
+            await self.crawl_if_stale()
+        except Exception as e:
+            # Serve what the change log already has
+            logger.warning("Change feed crawl failed: %s", e)
+        limit = max(1, min(int(limit), MAX_FEED_LIMIT))
+        records, next_seq = await CPU_EXECUTOR.run(self.index.changes_since, seq, limit)
+        return {
+            "success": True,
+            "returned_count": len(records),
+            "results": records,
+            "next_cursor": _encode_cursor(max(seq, next_seq)),
+            "crawled_at": self.last_crawl or None,
+            "last_crawl": self.last_stats or None,
+        }
+
+    def start(self) -> None:
+        """Starts the background crawl loop (no-op when interval is 0 or it already runs)."""
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        with background():
+            while True:
+                try:
+                    await self.crawl()
+                except Exception as e:
+                    logger.warning("Change feed crawl failed: %s", e)
+                await asyncio.sleep(self.interval)
+
+    def stop(self) -> None:
+        """Cancels the background crawl loop."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self._task = None
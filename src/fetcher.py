@@ -0,0 +1,101 @@
+"""
+Turbo.az HTTP Fetcher
+Fetches turbo.az pages over a pooled aiohttp session (no browser).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import aiohttp
+
+from .metrics import span
+from .scheduler import SCHEDULER
+
+logger = logging.getLogger("turbo-az-scraper")
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Max open connections of the shared session.
+HTTP_POOL_LIMIT = int(os.environ.get("TURBOAZ_HTTP_POOL_LIMIT", "20"))
+# Total timeout per page request, seconds.
+HTTP_TIMEOUT = float(os.environ.get("TURBOAZ_HTTP_TIMEOUT", "20"))
+
+# Status codes and body markers of anti-bot / challenge pages. The markers also occur in ordinary
+# pages (e.g. a reCAPTCHA on a contact form), so they only name the reason of a fallback.
+_CHALLENGE_STATUSES = (403, 429, 503)
+_CHALLENGE_MARKERS = (
+    "cf-challenge",
+    "challenge-platform",
+    "cf-browser-verification",
+    "Just a moment...",
+    "g-recaptcha",
+    "h-captcha",
+)
+
+
+def challenge_marker(html: str) -> Optional[str]:
+    """The first challenge marker found in a page, or None."""
+    return next((m for m in _CHALLENGE_MARKERS if m in html), None)
+
+
+class ChallengeError(Exception):
+    """Raised when turbo.az answers with a challenge page that needs a real browser."""
+
+
+class FetchError(Exception):
+    """Raised when a page could not be fetched (network error, unexpected status)."""
+
+
+class HttpFetcher:
+    """Shared aiohttp session for page fetches."""
+
+    def __init__(self, pool_limit: int = HTTP_POOL_LIMIT, timeout: float = HTTP_TIMEOUT):
+        self.pool_limit = pool_limit
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Creates the session on first use (must run inside the event loop)."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_limit, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    "User-Agent": USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "az-AZ,az;q=0.9,en;q=0.8",
+                },
+            )
+        return self._session
+
+    async def fetch(self, url: str) -> str:
+        """
+        Fetch a page and return its HTML.
+        Raises:
+            ChallengeError: challenge/anti-bot page detected.
+            FetchError: network error or unexpected HTTP status.
+            SchedulerError: refused by the request scheduler (queue full, deadline passed).
+        """
+        session = self._get_session()
+        await SCHEDULER.admit(url)
+        with span("http_fetch"):
+            try:
+                async with session.get(url) as response:
+                    html = await response.text()
+                    status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise FetchError(f"Request failed: {e}") from e
+            if status in _CHALLENGE_STATUSES:
+                marker = challenge_marker(html)
+                raise ChallengeError(f"HTTP {status}{f' ({marker})' if marker else ''} challenge at {url}")
+            if status != 200:
+                raise FetchError(f"HTTP {status} for {url}")
+            return html
+
+    async def close(self) -> None:
+        """Closes the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
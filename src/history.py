@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Turbo.az Price History
+Append-only time series of listing observations (price, currency, views) keyed
+by listing ID, in a SQLite (WAL) table clustered on (listing_id, at).
+Writes are queued and committed in batches by a background thread.
+Export from project root: python -m src.history [--since 2026-10-01] [--format csv|jsonl] [-o FILE]
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .catalog import CACHE_DIR
+from .metrics import HISTORY_OBSERVATIONS
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# Record observations of scraped listings ("0" = off).
+HISTORY_ENABLED = os.environ.get("TURBOAZ_HISTORY", "1") != "0"
+HISTORY_PATH = CACHE_DIR / "history.sqlite3"
+# Observations waiting for the writer; further ones are dropped while it is full.
+HISTORY_QUEUE_SIZE = int(os.environ.get("TURBOAZ_HISTORY_QUEUE_SIZE", "50000"))
+# Max observations per write transaction, and max seconds one waits in the queue.
+HISTORY_BATCH_SIZE = 2000
+HISTORY_FLUSH_INTERVAL = 1.0
+# Rows per fetch when exporting.
+_EXPORT_CHUNK = 5000
+
+_COLUMNS = ("listing_id", "at", "price", "currency", "views")
+
+
+def _iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Clustered on the primary key: one listing's history is a single range scan, no separate index
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS observations ("
+        " listing_id INTEGER NOT NULL, at INTEGER NOT NULL, price INTEGER, currency TEXT, views INTEGER,"
+        " PRIMARY KEY (listing_id, at)) WITHOUT ROWID"
+    )
+    return conn
+
+
+class PriceHistory:
+    """Observation store; record() only enqueues, a writer thread commits batches."""
+
+    def __init__(self, path: Path = HISTORY_PATH, queue_size: int = HISTORY_QUEUE_SIZE):
+        self.path = Path(path)
+        self._conn = _connect(self.path)
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="price-history", daemon=True)
+        self._writer.start()
+
+    def record(self, records: Iterable[dict]) -> None:
+        """
+        Queues one observation per listing record (listing_record/details_record form) that has
+        a numeric id and a price or view count. Never blocks; drops observations when the queue is full.
+        """
+        now = int(time.time())
+        for record in records:
+            listing_id = str(record.get("id") or "")
+            if not listing_id.isdigit() or (record.get("price") is None and record.get("views") is None):
+                continue
+            try:
+                self._queue.put_nowait((int(listing_id), now, record.get("price"), record.get("currency"), record.get("views")))
+            except queue.Full:
+                HISTORY_OBSERVATIONS.inc(result="dropped")
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + HISTORY_FLUSH_INTERVAL
+            stop = False
+            while len(batch) < HISTORY_BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: list[tuple]) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                # Same listing twice in one second (e.g. search card, then details): one merged observation
+                self._conn.executemany(
+                    "INSERT INTO observations (listing_id, at, price, currency, views) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (listing_id, at) DO UPDATE SET price = COALESCE(excluded.price, price),"
+                    " currency = COALESCE(excluded.currency, currency), views = COALESCE(excluded.views, views)",
+                    batch,
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.warning("Price history write failed (%d observations lost): %s", len(batch), e)
+                HISTORY_OBSERVATIONS.inc(len(batch), result="failed")
+                return
+        HISTORY_OBSERVATIONS.inc(len(batch), result="written")
+
+    def flush(self) -> None:
+        """Blocks until every queued observation is written."""
+        self._queue.join()
+
+    def get(self, listing_id: str, changes_only: bool = False) -> dict:
+        """
+        Observations of one listing, oldest first, with a short summary.
+        changes_only keeps only observations whose price, currency or views differ from the previous one.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT at, price, currency, views FROM observations WHERE listing_id = ? ORDER BY at",
+                (int(listing_id),),
+            ).fetchall()
+        total = len(rows)
+        if changes_only:
+            rows = [row for i, row in enumerate(rows) if i == 0 or row[1:] != rows[i - 1][1:]]
+        observations = [
+            {k: v for k, v in (("at", _iso(at)), ("price", price), ("currency", currency), ("views", views)) if v is not None}
+            for at, price, currency, views in rows
+        ]
+        result = {"listing_id": str(listing_id), "observation_count": total, "observations": observations}
+        priced = [row for row in rows if row[1] is not None]
+        if priced:
+            first, last = priced[0], priced[-1]
+            result["first_price"] = first[1]
+            result["last_price"] = last[1]
+            result["currency"] = last[2]
+            if first[2] == last[2]:
+                result["price_change"] = last[1] - first[1]
+            same_currency = [row[1] for row in priced if row[2] == last[2]]
+            result["min_price"] = min(same_currency)
+            result["max_price"] = max(same_currency)
+        return result
+
+    def close(self) -> None:
+        """Writes what is queued and stops the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+        with self._lock:
+            self._conn.close()
+
+
+def export_rows(since: Optional[float] = None, path: Path = HISTORY_PATH) -> Iterator[tuple]:
+    """
+    All observations (listing_id, at, price, currency, views) from Unix time `since` on,
+    ordered by listing and time, read in chunks over a connection of its own.
+    """
+    conn = _connect(path)
+    try:
+        cursor = conn.execute(
+            "SELECT listing_id, at, price, currency, views FROM observations"
+            " WHERE at >= ? ORDER BY listing_id, at",
+            (int(since or 0),),
+        )
+        while True:
+            rows = cursor.fetchmany(_EXPORT_CHUNK)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        conn.close()
+
+
+def export_lines(rows: Iterable[tuple], fmt: str = "csv") -> Iterator[str]:
+    """Export rows as CSV (with header) or JSON Lines text, one line per row."""
+    if fmt == "jsonl":
+        for listing_id, at, price, currency, views in rows:
+            record = {"listing_id": str(listing_id), "at": _iso(at), "price": price, "currency": currency, "views": views}
+            yield json.dumps({k: v for k, v in record.items() if v is not None}, ensure_ascii=False) + "\n"
+        return
+
+    class _Line:
+        def write(self, text: str) -> str:
+            return text
+
+    writer = csv.writer(_Line())
+    yield writer.writerow(_COLUMNS)
+    for listing_id, at, price, currency, views in rows:
+        yield writer.writerow((listing_id, _iso(at), price, currency, views))
+
+
+def parse_since(text: Optional[str]) -> Optional[float]:
+    """Unix time of an ISO date/datetime (UTC unless it has an offset)."""
+    if not text:
+        return None
+    if text.endswith(("Z", "z")):
+        # As in the exports; fromisoformat() only accepts "Z" from Python 3.11 on
+        text = text[:-1] + "+00:00"
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the price history store")
+    parser.add_argument("--since", help="only observations from this ISO date/time on (UTC)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+    if not HISTORY_PATH.exists():
+        sys.exit(f"No price history at {HISTORY_PATH}")
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for line in export_lines(export_rows(parse_since(args.since)), args.format):
+            out.write(line)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Turbo.az Thumbnail Cache
+Content-addressed disk cache of processed listing photos, keyed by
+(image URL, max_width, quality), with size-bounded LRU eviction.
+"""
+
+import base64
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .catalog import CACHE_DIR
+
+logger = logging.getLogger("turbo-az-mcp")
+
+THUMB_CACHE_DIR = CACHE_DIR / "thumbs"
+THUMB_CACHE_MAX_BYTES = int(os.environ.get("TURBOAZ_THUMB_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+# Eviction trims the cache down to this share of the budget.
+_EVICT_TO = 0.9
+
+
+class ThumbnailCache:
+    """Final JPEG bytes on disk; reads are memory-mapped, recency is the file mtime."""
+
+    def __init__(self, root: Path = THUMB_CACHE_DIR, max_bytes: int = THUMB_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None
+
+    def _path(self, url: str, max_width: int, quality: int) -> Path:
+        key = hashlib.sha256(f"{url}\n{max_width}\n{quality}".encode("utf-8")).hexdigest()
+        return self.root / key[:2] / f"{key}.jpg"
+
+    def read_base64(self, url: str, max_width: int, quality: int) -> Optional[str]:
+        """Base64 of the cached JPEG, encoded straight from the mapped file; None on miss."""
+        path = self._path(url, max_width, quality)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = base64.b64encode(mm).decode("ascii")
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty file cannot be mapped
+            self.misses += 1
+            return None
+        except OSError as e:
+            logger.warning("Thumbnail cache read failed: %s", e)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, url: str, max_width: int, quality: int, jpeg: bytes) -> None:
+        """Stores processed JPEG bytes (atomic rename), evicting old entries when over budget."""
+        if self.max_bytes <= 0:
+            return
+        path = self._path(url, max_width, quality)
+        try:
+            # Size of the entry being replaced (e.g. two requests processed the same image)
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".thumb-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(jpeg)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Thumbnail cache write failed: %s", e)
+            return
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan_size()
+            else:
+                self._bytes += len(jpeg) - replaced
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _files(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) of every cached file."""
+        out = []
+        for path in self.root.glob("*/*.jpg"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def _evict(self) -> None:
+        """Deletes least recently used files until the cache is under the eviction target."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * _EVICT_TO
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except FileNotFoundError:
+                total -= size
+            except OSError as e:
+                logger.warning("Thumbnail cache eviction failed: %s", e)
+        self._bytes = total
@@ -0,0 +1,130 @@
+"""
+Turbo.az Image Pipeline
+Downloads listing photos over a shared connection pool and resizes/re-encodes
+them on the CPU executor, so the event loop never decodes images itself.
+Processed photos are kept in the on-disk thumbnail cache.
+"""
+
+import asyncio
+import base64
+import io
+import logging
+import os
+from typing import Optional
+
+import aiohttp
+from PIL import Image
+
+from .executors import CPU_EXECUTOR
+from .image_cache import ThumbnailCache
+from .metrics import IMAGE_BYTES, span
+from .scheduler import SCHEDULER
+
+logger = logging.getLogger("turbo-az-mcp")
+
+# Max image downloads in flight at once.
+IMAGE_CONCURRENCY = int(os.environ.get("TURBOAZ_IMAGE_CONCURRENCY", "6"))
+IMAGE_TIMEOUT = 10
+
+
+def process_image(image_bytes: bytes, max_width: int = 800, quality: int = 70) -> bytes:
+    """
+    Resizes an image to at most max_width and re-encodes it as JPEG.
+    JPEGs are decoded at a reduced scale (draft mode) when they are much wider than needed.
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+
+    if img.format == "JPEG" and img.width > max_width:
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale, never below the target size.
+        img.draft("RGB", (max_width, max(1, img.height * max_width // img.width)))
+
+    # Convert RGBA to RGB if necessary (for JPEG compatibility)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        img = background
+
+    # Resize if image is larger than max_width
+    if img.width > max_width:
+        factor = img.width // max_width
+        if factor >= 2:
+            # Cheap box reduction first, LANCZOS only for the last step.
+            img = img.reduce(factor)
+        if img.width > max_width:
+            ratio = max_width / img.width
+            img = img.resize((max_width, max(1, int(img.height * ratio))), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=quality, optimize=True)
+    return output.getvalue()
+
+
+class ImagePipeline:
+    """Shared session + bounded concurrent downloads + image processing on the CPU executor."""
+
+    def __init__(self, concurrency: int = IMAGE_CONCURRENCY, cache: Optional[ThumbnailCache] = None):
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else ThumbnailCache()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency * 2, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=IMAGE_TIMEOUT),
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        session = self._get_session()
+        async with self._semaphore:
+            await SCHEDULER.admit(url, "image")
+            with span("image_download"):
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        logger.warning(f"Failed to fetch image {url}: HTTP {response.status}")
+                        return None
+                    data = await response.read()
+        IMAGE_BYTES.inc(len(data), direction="in")
+        return data
+
+    def _process_and_store(self, url: str, image_bytes: bytes, max_width: int, quality: int) -> str:
+        """CPU executor thread: resize/encode, save to the thumbnail cache, return base64."""
+        with span("image_process"):
+            jpeg = process_image(image_bytes, max_width, quality)
+        IMAGE_BYTES.inc(len(jpeg), direction="out")
+        self.cache.put(url, max_width, quality, jpeg)
+        return base64.b64encode(jpeg).decode('utf-8')
+
+    async def fetch(self, url: str, max_width: int = 800, quality: int = 70) -> Optional[tuple[str, str]]:
+        """
+        Fetches an image, resizes and compresses it, returns (base64_data, mime_type).
+        Returns None if fetch fails.
+        """
+        try:
+            cached = await CPU_EXECUTOR.run(self.cache.read_base64, url, max_width, quality)
+            if cached is not None:
+                return cached, 'image/jpeg'
+            image_bytes = await self._download(url)
+            if image_bytes is None:
+                return None
+            data = await CPU_EXECUTOR.run(self._process_and_store, url, image_bytes, max_width, quality)
+            return data, 'image/jpeg'
+        except Exception as e:
+            logger.warning(f"Error fetching image {url}: {e}")
+            return None
+
+    async def fetch_many(self, urls: list[str], max_width: int = 800, quality: int = 70) -> list[Optional[tuple[str, str]]]:
+        """fetch() for several images concurrently; results keep the order of urls."""
+        return await asyncio.gather(*(self.fetch(url, max_width, quality) for url in urls))
+
+    async def close(self) -> None:
+        """Closes the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,346 @@
+"""
+Turbo.az Listing Index
+Local SQLite (WAL) index of every listing seen on search and detail pages,
+so listings can be filtered, sorted and aggregated without touching the site,
+plus a change log of listings that were new or updated when seen.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .catalog import CACHE_DIR
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# Record scraped listings in the local index ("0" = off).
+INDEX_ENABLED = os.environ.get("TURBOAZ_INDEX", "1") != "0"
+INDEX_PATH = CACHE_DIR / "listings.sqlite3"
+# Max listings one query_listings call returns.
+MAX_QUERY_LIMIT = 500
+
+# Listing record fields stored as columns (both search cards and detail pages).
+_COLUMNS = (
+    "url", "title", "image", "make", "model", "price", "currency", "year",
+    "engine_l", "mileage_km", "city", "date", "views", "specs",
+)
+# Sort keys -> SQL expression (price_per_year: price divided by age in years, current year = 1).
+_SORT_KEYS = {
+    "price": "price",
+    "year": "year",
+    "mileage": "mileage_km",
+    "engine": "engine_l",
+    "date": "date",
+    "views": "views",
+    "price_per_year": "CAST(price AS REAL) / MAX(1, :this_year - year + 1)",
+}
+_GROUP_KEYS = ("make", "model", "year", "city", "currency")
+
+
+def split_title(title: Optional[str], makes: Iterable[str]) -> tuple[Optional[str], Optional[str]]:
+    """
+    (make, model) of a card title such as "Mercedes E 220", given the known make names.
+    The longest make the title starts with wins; the rest of the title is the model.
+    """
+    if not title:
+        return None, None
+    lowered = title.lower()
+    best = None
+    for make in makes:
+        if lowered.startswith(make.lower()) and (len(lowered) == len(make) or lowered[len(make)] == " "):
+            if best is None or len(make) > len(best):
+                best = make
+    if best is None:
+        return None, None
+    return best, title[len(best):].strip() or None
+
+
+class ListingIndex:
+    """
+    Listings keyed by id; later observations fill in fields without erasing known ones.
+    Each write appends to the change log the listings that were unknown ("new") or
+    whose price changed or date moved forward, e.g. bumped or edited ("updated").
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            " id TEXT PRIMARY KEY, url TEXT, title TEXT, image TEXT, make TEXT, model TEXT,"
+            " price INTEGER, currency TEXT, year INTEGER, engine_l REAL, mileage_km INTEGER,"
+            " city TEXT, date TEXT, views INTEGER, specs TEXT,"
+            " first_seen REAL NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS listings_make_model ON listings (make COLLATE NOCASE, model COLLATE NOCASE, year)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS listings_price ON listings (currency, price)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS listings_year ON listings (year)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS listings_mileage ON listings (mileage_km)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS listings_city ON listings (city COLLATE NOCASE)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, kind TEXT NOT NULL, at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS changes_at ON changes (at)")
+
+    def _changes(self, rows: list[dict]) -> list[tuple[str, str]]:
+        """(id, "new" | "updated") for rows that differ from what is stored (call inside the write transaction)."""
+        ids = [row["id"] for row in rows]
+        known = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            for listing_id, price, currency, posted in self._conn.execute(
+                f"SELECT id, price, currency, date FROM listings WHERE id IN ({marks})", chunk
+            ):
+                known[listing_id] = (price, currency, posted)
+        out = []
+        for row in rows:
+            if row["id"] not in known:
+                out.append((row["id"], "new"))
+                continue
+            price, currency, posted = known[row["id"]]
+            repriced = row.get("price") is not None and (row.get("price"), row.get("currency")) != (price, currency)
+            # Dates only move forward ("2026-10-12" and "2026-10-12T14:05" are the same day)
+            bumped = bool(row.get("date") and posted and row["date"][:10] > posted[:10])
+            if repriced or bumped:
+                out.append((row["id"], "updated"))
+        return out
+
+    def _upsert(self, rows: list[dict]) -> list[tuple[str, str]]:
+        """Writes rows; returns the (id, kind) change log entries it added."""
+        if not rows:
+            return []
+        now = time.time()
+        columns = ", ".join(("id",) + _COLUMNS + ("first_seen", "last_seen"))
+        placeholders = ", ".join(f":{c}" for c in ("id",) + _COLUMNS) + ", :now, :now"
+        updates = ", ".join(
+            f"{c} = MAX(COALESCE(excluded.{c}, {c}), COALESCE({c}, excluded.{c}))" if c == "date"
+            else f"{c} = COALESCE(excluded.{c}, {c})"
+            for c in _COLUMNS
+        )
+        sql = (
+            f"INSERT INTO listings ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}, last_seen = excluded.last_seen"
+        )
+        params = [{**{c: row.get(c) for c in _COLUMNS}, "id": row["id"], "now": now} for row in rows]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                changes = self._changes(params)
+                self._conn.executemany(sql, params)
+                self._conn.executemany(
+                    "INSERT INTO changes (id, kind, at) VALUES (?, ?, ?)",
+                    [(listing_id, kind, now) for listing_id, kind in changes],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return changes
+
+    def add_listings(self, listings: list[dict], makes: Iterable[str] = ()) -> list[tuple[str, str]]:
+        """Records search result listings (listing_record() form); make/model come from the title."""
+        makes = list(makes)
+        rows = []
+        for car in listings:
+            make, model = split_title(car.get("title"), makes)
+            rows.append({**car, "make": make, "model": model})
+        return self._upsert(rows)
+
+    def add_details(self, details: dict) -> list[tuple[str, str]]:
+        """Records one detail page (details_record() form)."""
+        if not details.get("id"):
+            return []
+        specs = details.get("specs")
+        return self._upsert([{
+            **details,
+            "date": details.get("posted_date"),
+            "image": (details.get("images") or [None])[0],
+            "specs": json.dumps(specs, ensure_ascii=False) if specs else None,
+        }])
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def _where(self, filters: dict) -> tuple[str, dict]:
+        """WHERE clause and parameters for query filters (unknown keys are ignored)."""
+        clauses = []
+        params: dict[str, Any] = {}
+        if filters.get("make"):
+            clauses.append("make = :make COLLATE NOCASE")
+            params["make"] = filters["make"]
+        if filters.get("model"):
+            # "X5" also matches its variants ("X5 M")
+            clauses.append("(model = :model COLLATE NOCASE OR model LIKE :model_prefix)")
+            params["model"] = filters["model"]
+            params["model_prefix"] = f"{filters['model']} %"
+        if filters.get("city"):
+            clauses.append("city = :city COLLATE NOCASE")
+            params["city"] = filters["city"]
+        if filters.get("currency"):
+            clauses.append("currency = :currency")
+            params["currency"] = filters["currency"].upper()
+        for key, column in (("price", "price"), ("year", "year"), ("mileage", "mileage_km"), ("engine", "engine_l")):
+            if filters.get(f"{key}_min") is not None:
+                clauses.append(f"{column} >= :{key}_min")
+                params[f"{key}_min"] = filters[f"{key}_min"]
+            if filters.get(f"{key}_max") is not None:
+                clauses.append(f"{column} <= :{key}_max")
+                params[f"{key}_max"] = filters[f"{key}_max"]
+        if filters.get("posted_since"):
+            clauses.append("date >= :posted_since")
+            params["posted_since"] = filters["posted_since"]
+        for n, (label, value) in enumerate((filters.get("specs") or {}).items()):
+            if '"' in label:
+                raise ValueError(f"Invalid spec name: {label}")
+            # Substring match on the detail page property ("Avtomat" in "Sürətlər qutusu")
+            clauses.append(f"json_extract(specs, :spec_path{n}) LIKE :spec_value{n}")
+            params[f"spec_path{n}"] = f'$."{label}"'
+            params[f"spec_value{n}"] = f"%{value}%"
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(
+        self,
+        filters: Optional[dict] = None,
+        sort: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> dict:
+        """
+        Listings matching the filters, sorted by a _SORT_KEYS key ("-" prefix: descending).
+        Listings without the sort value come last.
+        Raises:
+            ValueError: unknown sort key or invalid spec name.
+        """
+        where, params = self._where(filters or {})
+        params["this_year"] = date.today().year
+        order = "id"
+        if sort:
+            key = sort.lstrip("-")
+            if key not in _SORT_KEYS:
+                raise ValueError(f"Unknown sort key: {sort} (use one of {', '.join(_SORT_KEYS)})")
+            expr = _SORT_KEYS[key]
+            direction = "DESC" if sort.startswith("-") else "ASC"
+            order = f"({expr}) IS NULL, {expr} {direction}, id"
+        params["limit"] = max(0, min(int(limit), MAX_QUERY_LIMIT))
+        params["offset"] = max(0, int(offset))
+        columns = ("id",) + _COLUMNS
+        with self._lock:
+            matched = self._conn.execute(f"SELECT COUNT(*) FROM listings{where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM listings{where} ORDER BY {order} LIMIT :limit OFFSET :offset",
+                params,
+            ).fetchall()
+        results = []
+        for row in rows:
+            record = {c: v for c, v in zip(columns, row) if v is not None}
+            if "specs" in record:
+                record["specs"] = json.loads(record["specs"])
+            results.append(record)
+        return {"matched": matched, "returned_count": len(results), "results": results}
+
+    def aggregate(self, filters: Optional[dict] = None, group_by: Iterable[str] = (), currency: str = "AZN") -> dict:
+        """
+        Per group of matching listings: count, and median/min/max price over the
+        listings priced in `currency` (prices in different currencies are not mixed).
+        Raises:
+            ValueError: unknown group key.
+        """
+        group_by = list(group_by)
+        for key in group_by:
+            if key not in _GROUP_KEYS:
+                raise ValueError(f"Unknown group_by key: {key} (use one of {', '.join(_GROUP_KEYS)})")
+        where, params = self._where(filters or {})
+        select = ", ".join(group_by + ["price", "currency", "mileage_km"])
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {select} FROM listings{where}", params).fetchall()
+        n = len(group_by)
+        currency = currency.upper()
+        groups: dict[tuple, dict] = {}
+        for row in rows:
+            key = tuple(row[:n])
+            group = groups.setdefault(key, {"count": 0, "prices": [], "mileages": []})
+            group["count"] += 1
+            price, price_currency, mileage = row[n:]
+            if price is not None and price_currency == currency:
+                group["prices"].append(price)
+            if mileage is not None:
+                group["mileages"].append(mileage)
+        out = []
+        for key, group in groups.items():
+            entry = dict(zip(group_by, key))
+            entry["count"] = group["count"]
+            prices = group["prices"]
+            if prices:
+                entry["priced_count"] = len(prices)
+                entry["median_price"] = statistics.median(prices)
+                entry["min_price"] = min(prices)
+                entry["max_price"] = max(prices)
+            if group["mileages"]:
+                entry["median_mileage_km"] = statistics.median(group["mileages"])
+            out.append(entry)
+        out.sort(key=lambda e: -e["count"])
+        return {"matched": len(rows), "currency": currency, "groups": out}
+
+    def head(self) -> int:
+        """Sequence number of the latest change log entry (0 when empty)."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def changed_ids(self, seq: int) -> dict[str, str]:
+        """id -> change kind of the change log entries after `seq` ("new" wins over a later "updated")."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, kind FROM changes WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+        out: dict[str, str] = {}
+        for listing_id, kind in rows:
+            if out.get(listing_id) != "new":
+                out[listing_id] = kind
+        return out
+
+    def changes_since(self, seq: int, limit: int = 50) -> tuple[list[dict], int]:
+        """
+        Listings with change log entries after `seq`, oldest change first, one record per
+        listing (with its latest "change" kind and "changed_at" time).
+        Returns:
+            (records, sequence number to continue from).
+        """
+        columns = ("id",) + _COLUMNS
+        select = ", ".join(f"l.{c}" for c in columns)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT c.seq, c.kind, c.at, {select} FROM changes c JOIN listings l ON l.id = c.id"
+                " WHERE c.seq > ? ORDER BY c.seq LIMIT ?",
+                (seq, max(0, int(limit))),
+            ).fetchall()
+        records: dict[str, dict] = {}
+        for row in rows:
+            seq = row[0]
+            record = {c: v for c, v in zip(columns, row[3:]) if v is not None}
+            if "specs" in record:
+                record["specs"] = json.loads(record["specs"])
+            # A listing seen as new and then updated in the same batch stays "new"
+            kind = "new" if records.get(record["id"], {}).get("change") == "new" else row[1]
+            records.pop(record["id"], None)
+            records[record["id"]] = {**record, "change": kind, "changed_at": row[2]}
+        return list(records.values()), seq
+
+    def trim_changes(self, older_than: float) -> None:
+        """Drops change log entries recorded before the `older_than` timestamp."""
+        with self._lock:
+            self._conn.execute("DELETE FROM changes WHERE at < ?", (older_than,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,205 @@
+"""
+Turbo.az Metrics
+In-process counters, gauges and latency histograms rendered in the Prometheus text format,
+plus timing spans for the stages of a tool call (driver startup, page loads, parsing, ...).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger("turbo-az-mcp")
+
+# Histogram bucket upper bounds, seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonic counter per label set. Safe to update from worker threads."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+    def summary(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, k)}={_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Current value per label set (e.g. a queue depth); goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (count, sum, max kept for summaries)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., count, sum, max]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        n = len(self.buckets)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (n + 3)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[n] += 1
+            series[n + 1] += value
+            series[n + 2] = max(series[n + 2], value)
+
+    def samples(self) -> list[str]:
+        n = len(self.buckets)
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            for i, bound in enumerate(self.buckets + (float("inf"),)):
+                le = 'le="+Inf"' if i == n else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {_number(series[i])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {_number(series[n])}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {series[n + 1]!r}")
+        return lines
+
+    def summary(self) -> list[str]:
+        n = len(self.buckets)
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        return [
+            f"{self.name}{_labels(self.label_names, key)} n={int(s[n])} "
+            f"avg={s[n + 1] / s[n]:.3f}s max={s[n + 2]:.3f}s"
+            for key, s in items if s[n]
+        ]
+
+
+class Registry:
+    """Named metrics of this process."""
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self._metrics.setdefault(name, Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Compact one-line-per-series text for logs (only series that have data)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.summary())
+        return "\n".join(lines)
+
+
+REGISTRY = Registry()
+
+TOOL_LATENCY = REGISTRY.histogram("turboaz_tool_duration_seconds", "Tool call latency", ("tool",))
+TOOL_CALLS = REGISTRY.counter("turboaz_tool_calls_total", "Tool calls by outcome (ok, error, exception)", ("tool", "outcome"))
+STAGE_LATENCY = REGISTRY.histogram("turboaz_stage_duration_seconds", "Latency of one stage of a tool call", ("stage",))
+ERRORS = REGISTRY.counter("turboaz_errors_total", "Errors by stage and exception type", ("stage", "type"))
+CACHE_REQUESTS = REGISTRY.counter("turboaz_cache_requests_total", "Response cache lookups (hit, miss, shared)", ("tool", "result"))
+DRIVER_STARTS = REGISTRY.counter("turboaz_driver_starts_total", "Chrome sessions launched")
+DRIVER_RESTARTS = REGISTRY.counter("turboaz_driver_restarts_total", "Chrome sessions retired by reason", ("reason",))
+IMAGE_BYTES = REGISTRY.counter("turboaz_image_bytes_total", "Image bytes downloaded (in) and returned after resizing (out)", ("direction",))
+HISTORY_OBSERVATIONS = REGISTRY.counter("turboaz_history_observations_total", "Price history observations by result (written, dropped, failed)", ("result",))
+SCHEDULER_QUEUE_DEPTH = REGISTRY.gauge("turboaz_scheduler_queue_depth", "Fetches waiting for their turn, by host and priority", ("host", "priority"))
+SCHEDULER_WAIT = REGISTRY.histogram("turboaz_scheduler_wait_seconds", "Time a fetch waited for its turn", ("priority",))
+SCHEDULER_REJECTED = REGISTRY.counter("turboaz_scheduler_rejected_total", "Fetches refused by reason (queue_full, deadline)", ("priority", "reason"))
+EXECUTOR_THREADS = REGISTRY.gauge("turboaz_executor_threads", "Threads per executor (browser, cpu)", ("executor",))
+EXECUTOR_BUSY = REGISTRY.gauge("turboaz_executor_busy_threads", "Threads running a job", ("executor",))
+EXECUTOR_QUEUED = REGISTRY.gauge("turboaz_executor_queued_jobs", "Jobs waiting for a thread", ("executor",))
+EXECUTOR_BUSY_SECONDS = REGISTRY.counter("turboaz_executor_busy_seconds_total", "Thread time spent on jobs (rate / threads = utilization)", ("executor",))
+EXECUTOR_JOBS = REGISTRY.counter("turboaz_executor_jobs_total", "Executor jobs by outcome (ok, error, cancelled)", ("executor", "outcome"))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times the enclosed block as `stage`; an exception escaping it is counted by type."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.inc(stage=stage, type=type(e).__name__)
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
+
+
+def log_summary() -> None:
+    """Writes the current metrics summary to the log."""
+    text = REGISTRY.summary()
+    if text:
+        logger.info("Metrics summary:\n%s", text)
@@ -0,0 +1,179 @@
+"""
+Turbo.az Listing Models
+Listing records: numeric price, currency, year, engine volume and mileage
+and a normalized date parsed from the site's display strings (kept under `raw`),
+plus compact dict/JSON forms with optional field projection.
+"""
+
+import json
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+# Azerbaijan time (no DST), for "bugün"/"dünən" dates.
+BAKU_TZ = timezone(timedelta(hours=4))
+
+_CURRENCIES = {
+    "azn": "AZN",
+    "₼": "AZN",
+    "man": "AZN",
+    "$": "USD",
+    "usd": "USD",
+    "€": "EUR",
+    "eur": "EUR",
+}
+_MONTHS = {
+    "yanvar": 1, "fevral": 2, "mart": 3, "aprel": 4, "may": 5, "iyun": 6,
+    "iyul": 7, "avqust": 8, "sentyabr": 9, "oktyabr": 10, "noyabr": 11, "dekabr": 12,
+}
+_NUMBER = re.compile(r"\d[\d\s ]*")
+_DECIMAL = re.compile(r"\d+(?:[.,]\d+)?")
+_YEAR = re.compile(r"\b(19|20)\d{2}\b")
+_TIME = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+_DOTTED_DATE = re.compile(r"\b(\d{1,2})\.(\d{1,2})\.(\d{4})\b")
+_NAMED_DATE = re.compile(r"\b(\d{1,2})\s+([a-zə]+)(?:\s+(\d{4}))?", re.IGNORECASE)
+
+
+def parse_int(text: Optional[str]) -> Optional[int]:
+    """First grouped number in text: "150 000 km" -> 150000."""
+    match = _NUMBER.search(text or "")
+    if not match:
+        return None
+    return int(re.sub(r"\D", "", match.group()))
+
+
+def parse_price(text: Optional[str]) -> tuple[Optional[int], Optional[str]]:
+    """"25 500 AZN" -> (25500, "AZN"); "40 000 $" -> (40000, "USD")."""
+    amount = parse_int(text)
+    lowered = (text or "").lower()
+    currency = next((code for token, code in _CURRENCIES.items() if token in lowered), None)
+    return amount, currency
+
+
+def parse_year(text: Optional[str]) -> Optional[int]:
+    match = _YEAR.search(text or "")
+    return int(match.group()) if match else None
+
+
+def parse_engine(text: Optional[str]) -> Optional[float]:
+    """Engine volume in litres: "1.6 L" -> 1.6, "3.0 L / 310 a.g. / Benzin" -> 3.0."""
+    match = _DECIMAL.search(text or "")
+    return float(match.group().replace(",", ".")) if match else None
+
+
+def parse_date(text: Optional[str], now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Listing date as ISO 8601 ("2026-10-12" or "2026-10-12T14:05").
+    Understands "bugün 14:05", "dünən 22:13", "12.10.2026 14:05" and "12 oktyabr 2026".
+    """
+    if not text:
+        return None
+    lowered = text.lower()
+    today = (now or datetime.now(BAKU_TZ)).date()
+    day: Optional[date] = None
+    if "bugün" in lowered:
+        day = today
+    elif "dünən" in lowered:
+        day = today - timedelta(days=1)
+    elif match := _DOTTED_DATE.search(lowered):
+        try:
+            day = date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        except ValueError:
+            return None
+    elif (match := _NAMED_DATE.search(lowered)) and match.group(2) in _MONTHS:
+        year = int(match.group(3)) if match.group(3) else today.year
+        try:
+            day = date(year, _MONTHS[match.group(2)], int(match.group(1)))
+        except ValueError:
+            return None
+    if day is None:
+        return None
+    clock = _TIME.search(lowered)
+    if clock and int(clock.group(1)) < 24:
+        return f"{day.isoformat()}T{int(clock.group(1)):02d}:{clock.group(2)}"
+    return day.isoformat()
+
+
+def _compact(record: dict) -> dict:
+    """A record without its None and empty values."""
+    return {k: v for k, v in record.items() if v is not None and v != {} and v != []}
+
+
+def project(record: dict, fields: Optional[Iterable[str]]) -> dict:
+    """Only the requested keys of a record dict ("id" is always kept); all of it when fields is empty."""
+    if not fields:
+        return record
+    wanted = set(fields) | {"id"}
+    return {k: v for k, v in record.items() if k in wanted}
+
+
+def to_json(value: Any) -> str:
+    """Compact JSON (no indentation, non-ASCII kept) for tool output."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def listing_record(card: dict, now: Optional[datetime] = None) -> dict:
+    """
+    One search result card from a card dict of the HTML parser or SEARCH_RESULTS_JS (display strings).
+    Keys: id, url, title, image, price, currency, year, engine_l, mileage_km, city, date and raw
+    (the display strings of price, year, engine, mileage and date).
+    """
+    raw = {k: card[k] for k in ("price", "year", "engine", "mileage", "date") if card.get(k)}
+    price, currency = parse_price(card.get("price"))
+    return _compact({
+        "id": str(card["id"]),
+        "url": card["url"],
+        "title": card.get("title") or "N/A",
+        "image": card.get("image"),
+        "price": price,
+        "currency": currency,
+        "year": parse_year(card.get("year")),
+        "engine_l": parse_engine(card.get("engine")),
+        "mileage_km": parse_int(card.get("mileage")),
+        "city": card.get("city"),
+        "date": parse_date(card.get("date"), now),
+        "raw": raw,
+    })
+
+
+# Detail page property labels (Azerbaijani) -> record fields.
+_SPEC_MAKE = "Marka"
+_SPEC_MODEL = "Model"
+_SPEC_YEAR = "Buraxılış ili"
+_SPEC_ENGINE = "Mühərrik"
+_SPEC_MILEAGE = "Yürüş"
+
+
+def details_record(page: dict, now: Optional[datetime] = None) -> dict:
+    """
+    One listing page from a details dict of the HTML parser or DETAILS_JS (display strings).
+    Keys: url, id, title, make, model, price, currency, year, engine_l, mileage_km, city, posted_date,
+    views, images, specs, description, seller_name, phones and raw (display strings of price,
+    posted_date and views).
+    """
+    specs = page.get("specs") or {}
+    raw = {k: page[k] for k in ("price", "posted_date", "views") if page.get(k)}
+    price, currency = parse_price(page.get("price"))
+    url = page["url"]
+    listing_id = url.rstrip("/").split("/")[-1].split("-")[0]
+    return _compact({
+        "url": url,
+        "id": listing_id if listing_id.isdigit() else None,
+        "title": page.get("title") or "N/A",
+        "make": specs.get(_SPEC_MAKE),
+        "model": specs.get(_SPEC_MODEL),
+        "price": price,
+        "currency": currency,
+        "year": parse_year(specs.get(_SPEC_YEAR) or page.get("title")),
+        "engine_l": parse_engine(specs.get(_SPEC_ENGINE)),
+        "mileage_km": parse_int(specs.get(_SPEC_MILEAGE)),
+        "city": page.get("city") or specs.get("Şəhər"),
+        "posted_date": parse_date(page.get("posted_date"), now),
+        "views": parse_int(page.get("views")),
+        "images": list(page.get("images") or []),
+        "specs": dict(specs),
+        "description": page.get("description") or "",
+        "seller_name": page.get("seller_name"),
+        "phones": list(page.get("phones") or []),
+        "raw": raw,
+    })
@@ -0,0 +1,185 @@
+"""
+Turbo.az HTML Parser
+Parses listing, detail and search-form pages from raw HTML (no browser).
+Uses the same CSS class contracts as the Selenium scraper.
+"""
+
+from typing import Optional
+from urllib.parse import urljoin
+
+from selectolax.lexbor import LexborHTMLParser
+
+# tz-dropdown id -> name of the underlying <select> in the search form.
+_DROPDOWN_SELECTS = {
+    "q_make": "q[make][]",
+    "q_model": "q[model][]",
+}
+
+_SKIPPED_OPTION_CLASSES = ("tz-dropdown__option--reset", "tz-dropdown__option--not-found", "is-hidden")
+
+
+def _text(node) -> str:
+    """Element text with whitespace collapsed, like Selenium's `.text` on one line."""
+    if node is None:
+        return ""
+    return " ".join(node.text(separator="").split())
+
+
+def _multiline_text(node) -> str:
+    """Element text keeping line breaks between text nodes (descriptions)."""
+    if node is None:
+        return ""
+    lines = (" ".join(line.split()) for line in node.text(separator="\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _first(root, *selectors: str):
+    """First node matching any of the selectors, tried in order."""
+    for selector in selectors:
+        node = root.css_first(selector)
+        if node is not None:
+            return node
+    return None
+
+
+def parse_dropdown_options(html: str, dropdown_id: str) -> list[tuple[str, str]]:
+    """
+    Parse (val, label) pairs of a search-form dropdown.
+    Reads the tz-dropdown markup, falling back to the plain <select>.
+    Returns:
+        list of (data-val, label text).
+    """
+    tree = LexborHTMLParser(html)
+    out = []
+    for el in tree.css(f'.tz-dropdown[data-id="{dropdown_id}"] .tz-dropdown__list .tz-dropdown__option'):
+        val = (el.attributes.get("data-val") or "").strip()
+        if not val:
+            continue
+        cls = el.attributes.get("class") or ""
+        if any(c in cls for c in _SKIPPED_OPTION_CLASSES):
+            continue
+        label = _text(_first(el, ".tz-dropdown__option-label .text", ".tz-dropdown__option-label"))
+        if label:
+            out.append((val, label))
+    if out:
+        return out
+    select_name = _DROPDOWN_SELECTS.get(dropdown_id)
+    if select_name:
+        for el in tree.css(f'select[name="{select_name}"] option'):
+            val = (el.attributes.get("value") or "").strip()
+            label = _text(el)
+            if val and label:
+                out.append((val, label))
+    return out
+
+
+def parse_listing_card(item, base_url: str) -> Optional[dict]:
+    """Parse one `products-i` card; None when the card has no listing link."""
+    link = item.css_first(".products-i__link")
+    href = link.attributes.get("href") if link is not None else None
+    if not href:
+        return None
+    car = {}
+    car["url"] = urljoin(base_url, href)
+    car["id"] = car["url"].split("/")[-1].split("-")[0]
+
+    img = item.css_first(".products-i__top img")
+    src = img.attributes.get("src") if img is not None else None
+    car["image"] = urljoin(base_url, src) if src else None
+
+    title = item.css_first(".products-i__name")
+    car["title"] = _text(title) if title is not None else "N/A"
+
+    price = item.css_first(".products-i__price")
+    car["price"] = _text(price) if price is not None else "N/A"
+
+    attrs = item.css_first(".products-i__attributes")
+    if attrs is not None:
+        parts = [p.strip() for p in _text(attrs).split(",")]
+        if len(parts) >= 1:
+            car["year"] = parts[0]
+        if len(parts) >= 2:
+            car["engine"] = parts[1]
+        if len(parts) >= 3:
+            car["mileage"] = parts[2]
+
+    location = item.css_first(".products-i__datetime")
+    if location is not None:
+        loc_text = _text(location)
+        if "," in loc_text:
+            car["city"], car["date"] = [x.strip() for x in loc_text.split(",", 1)]
+        else:
+            car["city"] = loc_text
+    return car
+
+
+def parse_search_page(html: str, base_url: str, limit: Optional[int] = None) -> Optional[dict]:
+    """
+    Parse a listings page.
+    Returns:
+        {"total_count", "results"} or None if the HTML is not a listings page.
+    """
+    tree = LexborHTMLParser(html)
+    items = tree.css(".products-i")
+    if not items and _first(tree, ".products", ".products-title") is None:
+        return None
+    results = []
+    for item in items[:limit]:
+        car = parse_listing_card(item, base_url)
+        if car is not None:
+            results.append(car)
+    count = _first(tree, ".products-title__amount", ".products-title__count")
+    total_count = _text(count) if count is not None else str(len(results))
+    return {"total_count": total_count, "results": results}
+
+
+def parse_details_page(html: str, url: str) -> Optional[dict]:
+    """
+    Parse a listing detail page.
+    Returns:
+        details dict or None if the HTML is not a listing page.
+    """
+    tree = LexborHTMLParser(html)
+    if tree.css_first(".product") is None:
+        return None
+    details = {"url": url}
+
+    title = tree.css_first(".product-title")
+    details["title"] = _text(title) if title is not None else "N/A"
+
+    price = _first(tree, ".product-price__i--bold", ".product-price__i")
+    details["price"] = _text(price) if price is not None else "N/A"
+
+    details["images"] = [
+        urljoin(url, img.attributes["src"])
+        for img in tree.css(".product-photos__slider-top-i img")
+        if img.attributes.get("src")
+    ]
+
+    details["specs"] = {}
+    for prop in tree.css(".product-properties__i"):
+        label = prop.css_first(".product-properties__i-name")
+        value = prop.css_first(".product-properties__i-value")
+        if label is None or value is None:
+            continue
+        details["specs"][_text(label)] = _text(value)
+
+    details["description"] = _multiline_text(tree.css_first(".product-description__content"))
+
+    seller_name = tree.css_first(".product-owner__info-name")
+    if seller_name is not None:
+        details["seller_name"] = _text(seller_name)
+    region = tree.css_first(".product-owner__info-region")
+    if region is not None:
+        details["city"] = _text(region)
+
+    phones = (_text(p) for p in tree.css(".product-phones__i a, .js-phones-hidden-block a"))
+    details["phones"] = [p for p in phones if p]
+
+    for s in tree.css(".product-statistics__i .product-statistics__i-text"):
+        t = _text(s)
+        if "Yeniləndi:" in t or "yeniləndi" in t.lower():
+            details["posted_date"] = t
+        elif "Baxışların" in t or "baxış" in t.lower():
+            details["views"] = t
+    return details
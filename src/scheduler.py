@@ -0,0 +1,317 @@
+"""
+Turbo.az Request Scheduler
+Admission control in front of every page and image fetch: a token-bucket rate
+limit per host, a bounded wait queue per host served in priority order, and a
+deadline carried in the caller's context, so queued fetches of a caller that
+has given up are dropped instead of sent.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+from .catalog import CACHE_DIR
+from .executors import Executor
+from .metrics import SCHEDULER_QUEUE_DEPTH, SCHEDULER_REJECTED, SCHEDULER_WAIT
+
+logger = logging.getLogger("turbo-az-scraper")
+
+# Requests per second per host (0 = no rate limit).
+RATE_LIMIT = float(os.environ.get("TURBOAZ_RATE_LIMIT", "5"))
+# Requests a host may get at once after an idle spell.
+RATE_BURST = float(os.environ.get("TURBOAZ_RATE_BURST", "10"))
+# "memory" (per process) or "sqlite" (one budget per host shared by all processes using TURBOAZ_CACHE_DIR).
+RATE_LIMIT_BACKEND = os.environ.get("TURBOAZ_RATE_LIMIT_BACKEND", "memory")
+# Fetches that may wait per host; further ones are refused at once.
+QUEUE_SIZE = int(os.environ.get("TURBOAZ_QUEUE_SIZE", "100"))
+# Shared buckets: a process takes up to this many seconds' worth of tokens per transaction;
+# what it has not used after that long goes back to nobody (so it cannot hoard the budget).
+_LEASE_SECONDS = 0.5
+
+
+class Priority(IntEnum):
+    """Lower goes first."""
+
+    INTERACTIVE = 0  # a tool call is waiting on the fetch
+    BULK = 1  # many fetches for one tool call (e.g. get_car_details_batch)
+    BACKGROUND = 2  # refreshes and crawls nobody is waiting on
+
+
+class SchedulerError(Exception):
+    """Raised when a fetch is refused instead of sent."""
+
+
+class QueueFull(SchedulerError):
+    """Raised when too many fetches already wait for the host."""
+
+
+class DeadlineExceeded(SchedulerError):
+    """Raised when the caller's deadline passed before the fetch got its turn."""
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar("fetch_priority", default=Priority.INTERACTIVE)
+# time.monotonic() by which the caller needs its answer, or None
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("fetch_deadline", default=None)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Fetches made inside the block (and by tasks it starts) queue at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Fetches made inside the block are dropped once `seconds` have passed (an outer, earlier deadline still applies)."""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    until = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(until if outer is None else min(outer, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def background() -> Iterator[None]:
+    """For loops started from a tool call: background priority, without the caller's deadline."""
+    priority_token = _priority.set(Priority.BACKGROUND)
+    deadline_token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(deadline_token)
+        _priority.reset(priority_token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline (may be negative), or None without one."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+class TokenBucket:
+    """In-process token bucket of one host."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """Takes a token if one is available and returns 0, else returns the seconds until one is."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class SqliteTokenBuckets:
+    """
+    Token buckets of all hosts in a SQLite file (WAL mode), one budget per host for every
+    process sharing it. take() may wait for another process's write lock, so it is not called
+    on the event loop; it leases several tokens at once, which take_leased() then hands out.
+    """
+
+    def __init__(self, rate: float, burst: float, path: Path = CACHE_DIR / "ratelimit.sqlite3"):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.lease = max(1, min(int(self.burst), int(rate * _LEASE_SECONDS)))
+        # host -> (tokens left, time.monotonic() of the lease)
+        self._leases: dict[str, tuple[int, float]] = {}
+        self._lease_lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        # Used while the file cannot be written, so fetches keep a (per-process) limit
+        self._fallback: dict[str, TokenBucket] = {}
+
+    def _tokens(self, host: str, now: float) -> float:
+        row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE host = ?", (host,)).fetchone()
+        return self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+
+    def _wait(self, tokens: float) -> float:
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take_leased(self, host: str) -> bool:
+        """Takes a token of the host's current lease if one is left (no I/O, fine on the event loop)."""
+        with self._lease_lock:
+            left, leased_at = self._leases.get(host, (0, 0.0))
+            if left <= 0 or time.monotonic() - leased_at > _LEASE_SECONDS:
+                return False
+            self._leases[host] = (left - 1, leased_at)
+            return True
+
+    def take(self, host: str) -> float:
+        """TokenBucket.take() for `host`; also leases up to `lease` - 1 further tokens for take_leased()."""
+        now = time.time()
+        with self._lock:
+            try:
+                # Plain read first: a caller that has to wait does not take the write lock
+                wait = self._wait(self._tokens(host, now))
+                if wait > 0:
+                    return wait
+                self._conn.execute("BEGIN IMMEDIATE")
+                tokens = self._tokens(host, now)
+                taken = min(self.lease, int(tokens))
+                if taken >= 1:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO buckets (host, tokens, updated_at) VALUES (?, ?, ?)",
+                        (host, tokens - taken, now),
+                    )
+                self._conn.execute("COMMIT")
+                if taken > 1:
+                    with self._lease_lock:
+                        self._leases[host] = (taken - 1, time.monotonic())
+                return self._wait(tokens)
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.warning("Shared rate limit unavailable, limiting per process: %s", e)
+        bucket = self._fallback.setdefault(host, TokenBucket(self.rate, self.burst))
+        return bucket.take()
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "future")
+
+    def __init__(self, priority: Priority, seq: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _Host:
+    """Wait queue of one host and the task that lets its fetches through as tokens come in."""
+
+    def __init__(self, name: str, bucket: Optional[TokenBucket]):
+        self.name = name
+        self.bucket = bucket
+        self.heap: list[_Waiter] = []
+        self.pump: Optional[asyncio.Task] = None
+
+
+class Scheduler:
+    """Per-host admission for outgoing fetches: await admit(url) right before sending a request."""
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT,
+        burst: float = RATE_BURST,
+        queue_size: int = QUEUE_SIZE,
+        backend: str = RATE_LIMIT_BACKEND,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        self._shared = SqliteTokenBuckets(rate, burst) if backend == "sqlite" and rate > 0 else None
+        # One thread for the shared buckets' transactions, so waiting for the file lock never blocks the loop
+        self._io = Executor("ratelimit", 1) if self._shared is not None else None
+        self._hosts: dict[str, _Host] = {}
+        self._seq = itertools.count()
+
+    def _host(self, name: str) -> _Host:
+        host = self._hosts.get(name)
+        if host is None:
+            bucket = TokenBucket(self.rate, self.burst) if self._shared is None else None
+            host = self._hosts[name] = _Host(name, bucket)
+        return host
+
+    async def _take(self, host: _Host) -> float:
+        if host.bucket is not None:
+            return host.bucket.take()
+        if self._shared.take_leased(host.name):
+            return 0.0
+        return await self._io.run(self._shared.take, host.name)
+
+    async def admit(self, url: str, kind: str = "page") -> None:
+        """
+        Waits until a fetch of `url` may be sent: its host has a token and no
+        fetch of higher priority (or the same priority, queued earlier) is waiting.
+        Each kind of fetch (e.g. "page", "image") has its own bucket and queue per host,
+        so photo downloads do not use up the budget of page fetches.
+        Raises:
+            QueueFull: the host's queue is full.
+            DeadlineExceeded: the caller's deadline passed first.
+        """
+        level = _priority.get()
+        label = level.name.lower()
+        left = remaining()
+        if left is not None and left <= 0:
+            SCHEDULER_REJECTED.inc(priority=label, reason="deadline")
+            raise DeadlineExceeded("Deadline exceeded before the request was sent")
+        if self.rate <= 0:
+            return
+        name = urlsplit(url).hostname or ""
+        host = self._host(name if kind == "page" else f"{name}#{kind}")
+        if not host.heap and await self._take(host) == 0:
+            SCHEDULER_WAIT.observe(0.0, priority=label)
+            return
+        if len(host.heap) >= self.queue_size:
+            SCHEDULER_REJECTED.inc(priority=label, reason="queue_full")
+            raise QueueFull(f"Too many requests queued for {host.name}, try again later")
+
+        start = time.perf_counter()
+        waiter = _Waiter(level, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(host.heap, waiter)
+        SCHEDULER_QUEUE_DEPTH.inc(host=host.name, priority=label)
+        if host.pump is None or host.pump.done():
+            host.pump = asyncio.create_task(self._pump(host))
+        try:
+            await asyncio.wait_for(waiter.future, left)
+        except asyncio.TimeoutError:
+            SCHEDULER_REJECTED.inc(priority=label, reason="deadline")
+            raise DeadlineExceeded("Deadline exceeded while waiting to send the request") from None
+        finally:
+            # Cancelled or timed out: leave the queue now rather than when the turn comes
+            if waiter in host.heap:
+                host.heap.remove(waiter)
+                heapq.heapify(host.heap)
+                SCHEDULER_QUEUE_DEPTH.dec(host=host.name, priority=label)
+        SCHEDULER_WAIT.observe(time.perf_counter() - start, priority=label)
+
+    async def _pump(self, host: _Host) -> None:
+        """Hands the host's tokens to its waiters, best priority first, until the queue is empty."""
+        while host.heap:
+            wait = await self._take(host)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            waiter = heapq.heappop(host.heap)
+            SCHEDULER_QUEUE_DEPTH.dec(host=host.name, priority=waiter.priority.name.lower())
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+
+
+# Shared by the page fetcher, the browser engine and the image pipeline of this process.
+SCHEDULER = Scheduler()
@@ -1,28 +1,43 @@
 """
 Turbo.az Scraper
-Scrapes data from turbo.az using Selenium.
+Scrapes data from turbo.az over plain HTTP, falling back to Selenium
+when a challenge page needs a real browser.
 """
 
 import asyncio
+import base64
+import json
 import logging
+import math
 import os
 import re
+import sqlite3
+import threading
 import time
-import tempfile
-from typing import Optional
+from collections import deque
+from typing import AsyncIterator, Optional
 from urllib.parse import urlencode
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+
+from .driver_pool import DriverPool, PoolTimeout, POOL_SIZE, SessionCrashed
+from .fetcher import HttpFetcher, ChallengeError, FetchError, challenge_marker
+from .parser import parse_dropdown_options, parse_search_page, parse_details_page
+from .extract_js import DROPDOWN_OPTIONS_JS, SEARCH_RESULTS_JS, DETAILS_JS
+from .catalog import MakeModelCatalog
+from .executors import CPU_EXECUTOR, SHUTDOWN_TIMEOUT, Executor
+from .cache import ResponseCache
+from .index import INDEX_ENABLED, ListingIndex
+from .feed import ChangeFeed
+from .history import HISTORY_ENABLED, PriceHistory
+from .metrics import span
+from .models import listing_record, details_record
+from .scheduler import SCHEDULER, Priority, SchedulerError, background, priority, remaining
 
 logger = logging.getLogger("turbo-az-scraper")
 
-BASE_URL = "https://turbo.az"
+BASE_URL = os.environ.get("TURBOAZ_BASE_URL", "https://turbo.az").rstrip("/")
+
+# "http": fetch + parse HTML, Selenium only on challenge pages. "selenium": always use Chrome.
+ENGINE = os.environ.get("TURBOAZ_ENGINE", "http")
 
 # Full search params turbo.az expects (IDs for make/model, not names).
 SEARCH_BASE_PARAMS = {
@@ -59,92 +74,414 @@ SEARCH_BASE_PARAMS = {
     "q[availability_status]": "",
 }
 
-# WSL/Linux: Chrome binary path. Set CHROME_BINARY or install chromium in WSL.
-_CHROME_PATHS = (
-    os.environ.get("CHROME_BINARY"),
-    "/usr/bin/google-chrome",
-    "/usr/bin/google-chrome-stable",
-    "/usr/bin/chromium",
-    "/usr/bin/chromium-browser",
-)
+# Result pages fetched at once when a search spans several pages.
+SEARCH_PAGE_CONCURRENCY = int(os.environ.get("TURBOAZ_SEARCH_PAGE_CONCURRENCY", "3"))
+# Hard cap on pages read for one search.
+MAX_SEARCH_PAGES = int(os.environ.get("TURBOAZ_MAX_SEARCH_PAGES", "50"))
+
+# Search form dropdowns (Selenium): max wait for options to render, and poll interval.
+DROPDOWN_TIMEOUT = float(os.environ.get("TURBOAZ_DROPDOWN_TIMEOUT", "10"))
+DROPDOWN_POLL = float(os.environ.get("TURBOAZ_DROPDOWN_POLL", "0.05"))
+
+# Listings fetched at once by get_car_details_many.
+DETAILS_BATCH_CONCURRENCY = int(os.environ.get("TURBOAZ_DETAILS_BATCH_CONCURRENCY", "4"))
 
+# Max seconds one browser call may take; an overrunning call is aborted by killing its session.
+BROWSER_TIMEOUT = float(os.environ.get("TURBOAZ_BROWSER_TIMEOUT", "90"))
+
+# Seconds between liveness/memory probes of idle Chrome sessions (0 = off).
+DRIVER_PROBE_INTERVAL = float(os.environ.get("TURBOAZ_DRIVER_PROBE_INTERVAL", "60"))
+
+# Chrome sessions launched at startup (default: the whole pool when Chrome is the main engine).
+WARMUP_BROWSERS = int(os.environ.get("TURBOAZ_WARMUP_BROWSERS", str(POOL_SIZE if ENGINE == "selenium" else 0)))
+# Open /autos in each warmed-up session so cookies and caches are in place.
+WARMUP_NAVIGATE = os.environ.get("TURBOAZ_WARMUP_NAVIGATE", "1") != "0"
+
+# get_trending categories -> listing page.
+TRENDING_URLS = {
+    "new": f"{BASE_URL}/autos",
+    "popular": f"{BASE_URL}/autos?order=view_count",
+    "vip": f"{BASE_URL}/autos?q[extras][]=vip",
+}
+# Seconds between background refreshes of recently requested trending categories (0 = off).
+# Keep it below TURBOAZ_TRENDING_TTL so requests never find the cache expired.
+TRENDING_REFRESH = float(os.environ.get("TURBOAZ_TRENDING_REFRESH", "45"))
+# A category nobody requested for this many seconds is no longer refreshed.
+TRENDING_IDLE = 900.0
 
-def _find_chrome_binary() -> Optional[str]:
-    """Return first existing Chrome/Chromium binary path, or None."""
-    for path in _CHROME_PATHS:
-        if path and os.path.isfile(path):
-            return path
-    return None
+def _page_url(url: str, page: int) -> str:
+    """URL of results page `page` (1-based) of a search URL."""
+    if page <= 1:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}page={page}"
+
+
+def _unexpected_page(html: str, url: str) -> str:
+    """Reason a fetched page could not be parsed (challenge page or another layout)."""
+    marker = challenge_marker(html)
+    return f"Challenge page ({marker}) at {url}" if marker else f"Unexpected page (no listing content) at {url}"
+
+
+def _pages_needed(first: dict, limit: int) -> int:
+    """Results pages to read for `limit` listings, judged by the first page (its size and the total count)."""
+    page_size = first.get("returned_count", 0)
+    if page_size == 0 or page_size >= limit:
+        return 1
+    pages = math.ceil(limit / page_size)
+    total = _count_from_text(first.get("total_count"))
+    if total is not None:
+        pages = min(pages, math.ceil(total / page_size))
+    return max(1, min(pages, MAX_SEARCH_PAGES))
+
+
+def _count_from_text(text: Optional[str]) -> Optional[int]:
+    """Number in a count label such as "1 234 elan", or None."""
+    digits = re.sub(r"\D", "", text or "")
+    return int(digits) if digits else None
 
 
 class TurboAzScraper:
-    """Selenium-based scraper for Turbo.az."""
-    
-    def __init__(self):
-        self.driver = None
-    
-    def _get_driver(self):
-        """Creates Selenium WebDriver or returns existing one."""
-        if self.driver is None:
-            options = Options()
-            options.add_argument("--headless=new")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-setuid-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--disable-software-rasterizer")
-            options.add_argument("--remote-debugging-pipe")
-            options.add_argument(f"--user-data-dir={tempfile.mkdtemp()}")
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-            options.add_argument("--lang=az-AZ")
-            binary = _find_chrome_binary()
-            if binary:
-                options.binary_location = binary
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.driver.set_page_load_timeout(30)
-        
-        return self.driver
+    """Scraper for Turbo.az: HTTP engine with a pooled Selenium fallback."""
     
+    def __init__(self, pool_size: int = POOL_SIZE, engine: str = ENGINE):
+        self.pool = DriverPool(self._create_driver, size=pool_size, dispose=self._quit_driver)
+        # One thread per pooled browser: blocking Selenium calls never wait behind other work
+        self.browser = Executor("browser", self.pool.size)
+        self.http = HttpFetcher()
+        self.engine = engine
+        self.catalog = MakeModelCatalog()
+        self.cache = ResponseCache()
+        # Every scraped listing is recorded here for query_listings
+        self.index: Optional[ListingIndex] = ListingIndex() if INDEX_ENABLED else None
+        # New and changed listings, built on the index's change log
+        self.feed: Optional[ChangeFeed] = ChangeFeed(self, self.index) if self.index is not None else None
+        # Price/views observations of every scraped listing, written off the request path
+        self.history: Optional[PriceHistory] = PriceHistory() if HISTORY_ENABLED else None
+        self._catalog_lock = asyncio.Lock()
+        self._catalog_task: Optional[asyncio.Task] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        # Trending category -> (listings fetched per refresh, last request time)
+        self._trending: dict[str, tuple[int, float]] = {}
+        self._trending_task: Optional[asyncio.Task] = None
+        # Set once warm_up() has finished (successfully or not)
+        self.ready = asyncio.Event()
+
+    def _create_driver(self):
+        """Launches a new headless Chrome session for the pool (imports Selenium on first use)."""
+        from .browser import launch_chrome
+        return launch_chrome()
+
+    def _quit_driver(self, driver) -> None:
+        """Quits a pooled session and deletes its Chrome profile dir."""
+        from .browser import quit_chrome
+        quit_chrome(driver)
+
+    def _prepare_driver(self, driver) -> None:
+        """Warm-up step for a fresh session: open the search page once."""
+        if WARMUP_NAVIGATE:
+            with span("page_load"):
+                driver.get(f"{BASE_URL}/autos")
+
+    async def warm_up(self, browsers: int = WARMUP_BROWSERS) -> None:
+        """
+        Startup work that would otherwise land on the first tool call: resolve chromedriver,
+        launch `browsers` Chrome sessions and load the make catalog. Sets `ready` when done.
+        Failures are logged; the lazy paths still work afterwards.
+        """
+        start = time.perf_counter()
+        try:
+            if browsers > 0:
+                try:
+                    from .browser import resolve_chromedriver
+                    await self.browser.run(resolve_chromedriver)
+                    launched = await self.browser.run(self.pool.prewarm, browsers, self._prepare_driver)
+                    logger.info("Warm-up: %d browser session(s) ready", launched)
+                except Exception as e:
+                    logger.warning("Browser warm-up failed: %s", e)
+            try:
+                await self._ensure_makes()
+            except Exception as e:
+                logger.warning("Catalog warm-up failed: %s", e)
+            logger.info("Warm-up finished in %.1fs", time.perf_counter() - start)
+        finally:
+            self.ready.set()
+            if self.feed is not None:
+                self.feed.start()
+            if DRIVER_PROBE_INTERVAL > 0 and (self._probe_task is None or self._probe_task.done()):
+                self._probe_task = asyncio.create_task(self._probe_browsers_loop(browsers))
+
+    async def _probe_browsers_loop(self, keep_warm: int) -> None:
+        """Retires dead or bloated idle Chrome sessions and relaunches up to `keep_warm` of them."""
+        while True:
+            await asyncio.sleep(DRIVER_PROBE_INTERVAL)
+            try:
+                retired = await self.browser.run(self.pool.sweep)
+                if retired and keep_warm > 0:
+                    await self.browser.run(self.pool.prewarm, keep_warm, self._prepare_driver)
+            except Exception as e:
+                logger.warning("Browser probe failed: %s", e)
+
+    def _load(self, driver, url: str) -> None:
+        """Navigates a pooled driver and counts the page towards its recycle budget."""
+        with span("page_load"):
+            driver.get(url)
+        self.pool.mark_page(driver)
+
+    async def _run_browser(self, fn, *args):
+        """
+        Runs fn(driver, *args) in a browser executor thread on a checked-out pool driver,
+        once the request scheduler lets a turbo.az page load through. A call that outlives
+        BROWSER_TIMEOUT or the caller's deadline, or whose caller is cancelled, is aborted
+        by killing its browser session (a blocked driver.get would otherwise run on).
+        Raises:
+            PoolTimeout: no browser became free in time.
+            SchedulerError: refused by the request scheduler.
+            FetchError: the call was aborted after timing out, or failed in the browser.
+        A session that crashes during the call is replaced and the call retried once.
+        """
+        from .browser import WebDriverException
+
+        await SCHEDULER.admit(BASE_URL)
+        left = remaining()
+        timeout = BROWSER_TIMEOUT if left is None else max(0.0, min(left, BROWSER_TIMEOUT))
+        lock = threading.Lock()
+        # Driver the call is using right now (None once fn returned, before the pool gets it
+        # back), and whether its caller gave up
+        state = {"driver": None, "abandoned": False}
+
+        def _call():
+            for attempt in range(2):
+                try:
+                    with self.pool.driver(min(timeout, self.pool.checkout_timeout)) as driver:
+                        with lock:
+                            if state["abandoned"]:
+                                return None
+                            state["driver"] = driver
+                        try:
+                            return fn(driver, *args)
+                        finally:
+                            # From here on the driver may go to another call: never abort it
+                            with lock:
+                                state["driver"] = None
+                except SessionCrashed as e:
+                    with lock:
+                        gave_up = state["abandoned"]
+                    if attempt or gave_up:
+                        raise FetchError(f"Browser crashed: {e}") from e
+                    logger.warning("Browser session crashed (%s), retrying on a new one", e)
+                except WebDriverException as e:
+                    raise FetchError(f"Browser error: {e.msg}") from e
+
+        try:
+            return await asyncio.wait_for(self.browser.run(_call), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with lock:
+                state["abandoned"] = True
+                # Under the lock, so the call cannot hand the driver back to the pool meanwhile
+                if state["driver"] is not None:
+                    self.pool.abort(state["driver"])
+            if isinstance(e, asyncio.TimeoutError):
+                raise FetchError(f"Browser call timed out after {timeout:.1f}s") from None
+            raise
+
+    async def _browser_result(self, fn, *args) -> dict:
+        """_run_browser for scrapes returning a result dict; pool exhaustion becomes an error result."""
+        try:
+            return await self._run_browser(fn, *args)
+        except (FetchError, PoolTimeout, SchedulerError) as e:
+            return {"success": False, "error": str(e)}
+
+    async def _try_http(self, fetch, *args) -> Optional[dict]:
+        """
+        Runs an HTTP-engine coroutine.
+        Returns:
+            its result, an error dict on fetch failure, or None to fall back to Selenium.
+        """
+        if self.engine != "http":
+            return None
+        try:
+            return await fetch(*args)
+        except ChallengeError as e:
+            logger.info("%s, falling back to Selenium", e)
+            return None
+        except (FetchError, SchedulerError) as e:
+            return {"success": False, "error": str(e)}
+
+    async def _index_result(self, result: dict) -> dict:
+        """
+        Records the listings of a successful search page or detail result in the index and price history; returns it.
+        Index writes (which may wait for another process's write lock) run on the CPU executor, off the event loop.
+        """
+        if not result.get("success"):
+            return result
+        if self.history is not None:
+            self.history.record([result["details"]] if "details" in result else result["results"])
+        if self.index is None:
+            return result
+        try:
+            if "details" in result:
+                await CPU_EXECUTOR.run(self.index.add_details, result["details"])
+            else:
+                await CPU_EXECUTOR.run(self.index.add_listings, result["results"], self.catalog.make_labels())
+        except sqlite3.Error as e:
+            logger.warning("Listing index write failed: %s", e)
+        return result
+
+    def _scrape_dropdown(self, driver, make_id: Optional[str] = None) -> list[tuple[str, str]]:
+        """
+        Selenium: make options of the search form, or model options after selecting make_id.
+        Raises:
+            FetchError: the search form or its options did not load.
+        """
+        from .browser import By, EC, TimeoutException, WebDriverException, WebDriverWait
+
+        try:
+            self._load(driver, f"{BASE_URL}/autos")
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"]'))
+            )
+        except TimeoutException:
+            raise FetchError("Page failed to load (timeout)")
+        wait = WebDriverWait(driver, DROPDOWN_TIMEOUT, poll_frequency=DROPDOWN_POLL)
+        try:
+            # Dropdown options are rendered by page scripts after the container appears
+            make_opts = wait.until(lambda d: self._parse_tz_dropdown_options(d, "q_make"))
+        except TimeoutException:
+            raise FetchError("Make options did not load (timeout)")
+        if not make_id:
+            return make_opts
+        models_before = self._parse_tz_dropdown_options(driver, "q_model")
+        # Open make dropdown and click make option so model list is populated
+        option_css = f'.tz-dropdown[data-id="q_make"] .tz-dropdown__option[data-val="{make_id}"]'
+        try:
+            driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"] .tz-dropdown__selected').click()
+            wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, option_css))).click()
+        except WebDriverException:
+            try:
+                driver.execute_script("arguments[0].click()", driver.find_element(By.CSS_SELECTOR, option_css))
+            except WebDriverException:
+                pass
+        # Open model dropdown so options are in DOM
+        try:
+            driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_model"] .tz-dropdown__selected').click()
+        except WebDriverException:
+            pass
+        # Model list is refreshed asynchronously once the make is selected
+        try:
+            return wait.until(
+                lambda d: (opts := self._parse_tz_dropdown_options(d, "q_model")) and opts != models_before and opts
+            )
+        except TimeoutException:
+            raise FetchError(f"Model options of make {make_id} did not load (timeout)")
+
+    async def _load_options(self, make_id: Optional[str] = None) -> list[tuple[str, str]]:
+        """
+        Make options, or model options of make_id, read from the site.
+        Raises:
+            FetchError, PoolTimeout: the search form could not be loaded.
+            SchedulerError: refused by the request scheduler.
+        """
+        with span("dropdown"):
+            if self.engine == "http":
+                try:
+                    if make_id:
+                        html = await self.http.fetch(self._build_search_url(make_id=make_id))
+                        return await CPU_EXECUTOR.run(parse_dropdown_options, html, "q_model")
+                    html = await self.http.fetch(f"{BASE_URL}/autos")
+                    make_opts = await CPU_EXECUTOR.run(parse_dropdown_options, html, "q_make")
+                    if make_opts:
+                        return make_opts
+                    raise ChallengeError("Make list missing from /autos")
+                except ChallengeError as e:
+                    logger.info("%s, falling back to Selenium", e)
+            return await self._run_browser(self._scrape_dropdown, make_id)
+
+    async def _ensure_makes(self) -> None:
+        """Loads the make list into the catalog if it has never been fetched."""
+        self._start_catalog_refresh()
+        self.catalog.reload_if_changed()
+        if self.catalog.has_makes():
+            return
+        async with self._catalog_lock:
+            if not self.catalog.has_makes():
+                self.catalog.set_makes(await self._load_options())
+
+    async def _ensure_models(self, make_id: str) -> None:
+        """Loads a make's model list into the catalog if it has never been fetched."""
+        self.catalog.reload_if_changed()
+        if self.catalog.has_models(make_id):
+            return
+        async with self._catalog_lock:
+            if not self.catalog.has_models(make_id):
+                self.catalog.set_models(make_id, await self._load_options(make_id))
+
+    async def _resolve_ids(self, make: Optional[str], model: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+        """
+        Make and model IDs for search URLs, from the catalog.
+        Returns:
+            (make_id, model_id); make_id is None if the make is unknown, model_id if the model is.
+        """
+        if not make:
+            return None, None
+        await self._ensure_makes()
+        make_id = self.catalog.find_make(make)
+        if not make_id or not model:
+            return make_id, None
+        await self._ensure_models(make_id)
+        return make_id, self.catalog.find_model(make_id, model)
+
+    def _start_catalog_refresh(self) -> None:
+        """Starts the background catalog refresh task once per event loop."""
+        if self._catalog_task is None or self._catalog_task.done():
+            self._catalog_task = asyncio.get_running_loop().create_task(self._refresh_catalog_loop())
+
+    async def _refresh_catalog_loop(self) -> None:
+        """Re-reads make and model lists from the site whenever they pass the catalog TTL."""
+        with background():
+            while True:
+                await asyncio.sleep(max(self.catalog.seconds_until_stale(), 60.0))
+                try:
+                    if time.time() - self.catalog.makes_fetched_at >= self.catalog.ttl:
+                        self.catalog.set_makes(await self._load_options())
+                    for make_id in self.catalog.stale_makes():
+                        self.catalog.set_models(make_id, await self._load_options(make_id))
+                    logger.info("Make/model catalog refreshed")
+                except Exception as e:
+                    logger.warning("Catalog refresh failed: %s", e)
+
+    async def close(self, timeout: float = SHUTDOWN_TIMEOUT) -> None:
+        """
+        Graceful shutdown: stops background work, lets running browser calls finish for up
+        to `timeout` seconds (then kills their sessions) and closes the HTTP session.
+        """
+        for task in (self._catalog_task, self._probe_task):
+            if task is not None and not task.done():
+                task.cancel()
+        # Idle sessions quit now, busy ones when their call returns
+        self._close_driver()
+        if await self.browser.shutdown(timeout):
+            self.pool.abort_all()
+        await self.http.close()
+        await self.cache.close(timeout)
+
     def _close_driver(self):
-        """Closes WebDriver."""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        """Closes all pooled WebDrivers."""
+        if self.feed is not None:
+            self.feed.stop()
+        if self._trending_task is not None and not self._trending_task.done():
+            self._trending_task.cancel()
+        if self.history is not None:
+            self.history.close()
+        self.pool.close()
 
     def _parse_tz_dropdown_options(self, driver, dropdown_id: str):
         """
-        Parse (val, label) from tz-dropdown div (data-id=dropdown_id).
+        Parse (val, label) from tz-dropdown div (data-id=dropdown_id) in one script call.
         Skips reset/not-found/hidden options.
         Returns:
             list of (data-val, label text).
         """
-        out = []
-        try:
-            container = driver.find_element(By.CSS_SELECTOR, f'.tz-dropdown[data-id="{dropdown_id}"]')
-            opts = container.find_elements(By.CSS_SELECTOR, ".tz-dropdown__list .tz-dropdown__option")
-            for el in opts:
-                val = (el.get_attribute("data-val") or "").strip()
-                if not val:
-                    continue
-                cls = (el.get_attribute("class") or "")
-                if "tz-dropdown__option--reset" in cls or "tz-dropdown__option--not-found" in cls or "is-hidden" in cls:
-                    continue
-                try:
-                    label_el = el.find_element(By.CSS_SELECTOR, ".tz-dropdown__option-label .text")
-                    label = (label_el.text or "").strip()
-                except NoSuchElementException:
-                    try:
-                        label_el = el.find_element(By.CLASS_NAME, "tz-dropdown__option-label")
-                        label = (label_el.text or "").strip()
-                    except NoSuchElementException:
-                        label = ""
-                if label:
-                    out.append((val, label))
-        except NoSuchElementException:
-            pass
-        return out
+        return [(val, label) for val, label in driver.execute_script(DROPDOWN_OPTIONS_JS, dropdown_id) or []]
 
     def _build_search_url(
         self,
@@ -177,7 +514,7 @@ class TurboAzScraper:
             params["q[transmission][]"] = str(transmission_id)
         return f"{BASE_URL}/autos?{urlencode(params, doseq=True)}"
     
-    async def search_cars(
+    async def _search_url(
         self,
         make: Optional[str] = None,
         model: Optional[str] = None,
@@ -187,9 +524,12 @@ class TurboAzScraper:
         year_max: Optional[int] = None,
         fuel_type: Optional[str] = None,
         transmission: Optional[str] = None,
-        limit: int = 20
-    ) -> dict:
-        """Searches for cars (gets ID from make/model name and builds full URL)."""
+    ) -> tuple[Optional[str], Optional[dict]]:
+        """
+        Search URL for the given filters (make/model names resolved to IDs).
+        Returns:
+            (url, None), or (None, error result) when the make is unknown or the catalog failed to load.
+        """
         fuel_mapping = {
             "benzin": 1, "dizel": 2, "qaz": 3, "elektrik": 6, "hibrid": 7, "plug-in hibrid": 8,
         }
@@ -198,153 +538,207 @@ class TurboAzScraper:
         }
         fuel_id = fuel_mapping.get((fuel_type or "").lower()) if fuel_type else None
         transmission_id = transmission_mapping.get((transmission or "").lower()) if transmission else None
+        filters = {
+            "price_min": price_min,
+            "price_max": price_max,
+            "year_min": year_min,
+            "year_max": year_max,
+            "fuel_id": fuel_id,
+            "transmission_id": transmission_id,
+        }
 
-        def _scrape():
-            driver = self._get_driver()
-            results = []
-            make_id = None
-            model_id = None
-            try:
-                if make:
-                    driver.get(f"{BASE_URL}/autos")
-                    WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"]'))
-                    )
-                    time.sleep(0.3)
-                    try:
-                        driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"] .tz-dropdown__selected').click()
-                        time.sleep(0.2)
-                    except Exception:
-                        pass
-                    make_opts = self._parse_tz_dropdown_options(driver, "q_make")
-                    make_lower = make.strip().lower()
-                    for val, label in make_opts:
-                        txt = label.lower()
-                        if txt == make_lower or txt.startswith(make_lower + " ") or txt.startswith(make_lower + "(") or make_lower in txt:
-                            make_id = val
-                            break
-                    if not make_id:
-                        all_makes = [label for _, label in make_opts[:20]]
-                        logger.warning("Make not found. Sample options: %s", all_makes)
-                        return {"success": False, "error": f"Make not found: {make}"}
-                    if model:
-                        # Open make dropdown and click make option so model list is populated
-                        try:
-                            make_cont = driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"]')
-                            make_cont.find_element(By.CSS_SELECTOR, ".tz-dropdown__selected").click()
-                            time.sleep(0.3)
-                            opts_el = make_cont.find_elements(By.CSS_SELECTOR, ".tz-dropdown__list .tz-dropdown__option")
-                            for el in opts_el:
-                                if (el.get_attribute("data-val") or "").strip() == make_id:
-                                    el.click()
-                                    break
-                            time.sleep(0.5)
-                        except Exception:
-                            pass
-                        # Open model dropdown so options are in DOM
-                        try:
-                            driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_model"] .tz-dropdown__selected').click()
-                            time.sleep(0.2)
-                        except Exception:
-                            pass
-                        model_opts = self._parse_tz_dropdown_options(driver, "q_model")
-                        model_lower = model.strip().lower()
-                        for val, label in model_opts:
-                            txt = label.lower()
-                            if txt == model_lower or txt.startswith(model_lower + " ") or txt.startswith(model_lower + "("):
-                                model_id = val
-                                break
-                url = self._build_search_url(
-                    make_id=make_id,
-                    model_id=model_id,
-                    price_min=price_min,
-                    price_max=price_max,
-                    year_min=year_min,
-                    year_max=year_max,
-                    fuel_id=fuel_id,
-                    transmission_id=transmission_id,
-                )
-                logger.info(f"Searching: {url}")
-                driver.get(url)
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "products-i"))
-                )
-
-                # Find listings
-                items = driver.find_elements(By.CLASS_NAME, "products-i")[:limit]
-                
-                for item in items:
-                    try:
-                        car = {}
+        try:
+            make_id, model_id = await self._resolve_ids(make, model)
+        except (FetchError, PoolTimeout, SchedulerError) as e:
+            return None, {"success": False, "error": str(e)}
+        if make and not make_id:
+            logger.warning("Make not found. Sample options: %s", self.catalog.make_labels()[:20])
+            return None, {"success": False, "error": f"Make not found: {make}"}
+        return self._build_search_url(make_id=make_id, model_id=model_id, **filters), None
 
-                        # Title and link
-                        link_elem = item.find_element(By.CLASS_NAME, "products-i__link")
-                        car["url"] = link_elem.get_attribute("href")
-                        car["id"] = car["url"].split("/")[-1].split("-")[0]
+    async def search_cars(
+        self,
+        make: Optional[str] = None,
+        model: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        fuel_type: Optional[str] = None,
+        transmission: Optional[str] = None,
+        limit: int = 20
+    ) -> dict:
+        """Searches for cars (gets ID from make/model name and builds full URL), reading as many pages as limit needs."""
+        url, error = await self._search_url(make, model, price_min, price_max, year_min, year_max, fuel_type, transmission)
+        if error:
+            return error
+        return await self.cache.get_or_fetch("search_cars", f"{limit}:{url}", lambda: self._collect_search(url, limit))
 
-                        # Image
-                        try:
-                            img = item.find_element(By.CSS_SELECTOR, ".products-i__top img")
-                            car["image"] = img.get_attribute("src")
-                        except NoSuchElementException:
-                            car["image"] = None
+    async def _search_page(self, url: str, page: int) -> dict:
+        """All listings of one results page (page >= 1), cached like other search results."""
+        page_url = _page_url(url, page)
+        return await self.cache.get_or_fetch("search_cars", f"page:{page_url}", lambda: self._scrape_search(page_url, None))
 
-                        # Title (make + model)
-                        try:
-                            title = item.find_element(By.CLASS_NAME, "products-i__name")
-                            car["title"] = title.text.strip()
-                        except NoSuchElementException:
-                            car["title"] = "N/A"
+    async def _collect_search(self, url: str, limit: int) -> dict:
+        """
+        First results page, then the further pages needed for `limit` listings,
+        fetched concurrently (SEARCH_PAGE_CONCURRENCY) and deduplicated by listing id.
+        """
+        first = await self._scrape_search(url, limit)
+        if not first.get("success"):
+            return first
+        pages = _pages_needed(first, limit)
+        if pages <= 1:
+            return first
 
-                        # Price
-                        try:
-                            price = item.find_element(By.CLASS_NAME, "products-i__price")
-                            car["price"] = price.text.strip()
-                        except NoSuchElementException:
-                            car["price"] = "N/A"
+        semaphore = asyncio.Semaphore(SEARCH_PAGE_CONCURRENCY)
 
-                        # Additional info (year, engine, mileage)
-                        try:
-                            attrs = item.find_elements(By.CLASS_NAME, "products-i__attributes")
-                            if attrs:
-                                attr_text = attrs[0].text.strip()
-                                parts = [p.strip() for p in attr_text.split(",")]
-                                if len(parts) >= 1:
-                                    car["year"] = parts[0]
-                                if len(parts) >= 2:
-                                    car["engine"] = parts[1]
-                                if len(parts) >= 3:
-                                    car["mileage"] = parts[2]
-                        except NoSuchElementException:
-                            pass
-
-                        # City and date
-                        try:
-                            location = item.find_element(By.CLASS_NAME, "products-i__datetime")
-                            loc_text = location.text.strip()
-                            if "," in loc_text:
-                                car["city"], car["date"] = [x.strip() for x in loc_text.split(",", 1)]
-                            else:
-                                car["city"] = loc_text
-                        except NoSuchElementException:
-                            pass
-                        
-                        results.append(car)
-                        
-                    except Exception as e:
-                        logger.warning(f"Item parse error: {e}")
-                        continue
+        async def _fetch(page: int) -> dict:
+            async with semaphore:
+                return await self._search_page(url, page)
 
-                # Total result count
-                try:
-                    count_elem = driver.find_element(By.CLASS_NAME, "products-title__amount")
-                    total_count = count_elem.text.strip()
-                except NoSuchElementException:
-                    try:
-                        count_elem = driver.find_element(By.CLASS_NAME, "products-title__count")
-                        total_count = count_elem.text.strip()
-                    except NoSuchElementException:
-                        total_count = str(len(results))
+        results = list(first["results"])
+        seen = {car["id"] for car in results}
+        for page, result in enumerate(await asyncio.gather(*(_fetch(p) for p in range(2, pages + 1))), start=2):
+            if not result.get("success"):
+                logger.warning("Search page %d failed: %s", page, result.get("error"))
+                break
+            for car in result["results"]:
+                if car["id"] not in seen:
+                    seen.add(car["id"])
+                    results.append(car)
+        results = results[:limit]
+        return {
+            "success": True,
+            "total_count": first["total_count"],
+            "returned_count": len(results),
+            "search_url": url,
+            "results": results
+        }
+
+    async def stream_search(
+        self,
+        make: Optional[str] = None,
+        model: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        fuel_type: Optional[str] = None,
+        transmission: Optional[str] = None,
+        limit: int = 20
+    ) -> AsyncIterator[dict]:
+        """
+        search_cars one results page at a time: yields each page as soon as it is parsed
+        (in page order, up to SEARCH_PAGE_CONCURRENCY pages fetched ahead), holding only
+        listings not yielded before and at most `limit` listings in all. An unknown make or
+        a failed first page is yielded as the only (error) result; a later failed page ends the stream.
+        """
+        url, error = await self._search_url(make, model, price_min, price_max, year_min, year_max, fuel_type, transmission)
+        if error:
+            yield error
+            return
+        first = await self._search_page(url, 1)
+        if not first.get("success"):
+            yield first
+            return
+        pages = _pages_needed(first, limit)
+        seen: set[str] = set()
+        pending: deque[tuple[int, asyncio.Task]] = deque()
+        next_page, page, result = 2, 1, first
+        try:
+            while True:
+                # Later pages load while the consumer handles this one
+                while next_page <= pages and len(pending) < SEARCH_PAGE_CONCURRENCY:
+                    pending.append((next_page, asyncio.ensure_future(self._search_page(url, next_page))))
+                    next_page += 1
+                cars = [car for car in result["results"] if car["id"] not in seen][:limit - len(seen)]
+                seen.update(car["id"] for car in cars)
+                yield {
+                    "success": True,
+                    "total_count": first["total_count"],
+                    "page": page,
+                    "returned_count": len(cars),
+                    "search_url": url,
+                    "results": cars
+                }
+                if len(seen) >= limit or not pending:
+                    return
+                page, task = pending.popleft()
+                result = await task
+                if not result.get("success"):
+                    logger.warning("Search page %d failed: %s", page, result.get("error"))
+                    return
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def search_cars_paged(
+        self,
+        cursor: Optional[str] = None,
+        make: Optional[str] = None,
+        model: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        fuel_type: Optional[str] = None,
+        transmission: Optional[str] = None,
+    ) -> dict:
+        """
+        One results page per call. Without cursor the filters start a new search;
+        with cursor (from a previous next_cursor) the filters are ignored.
+        """
+        if cursor:
+            try:
+                state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+                url, page = state["u"], int(state["p"])
+            except (ValueError, KeyError, TypeError):
+                return {"success": False, "error": "Invalid cursor"}
+            if not url.startswith(f"{BASE_URL}/autos?") or page < 1:
+                return {"success": False, "error": "Invalid cursor"}
+        else:
+            url, error = await self._search_url(make, model, price_min, price_max, year_min, year_max, fuel_type, transmission)
+            if error:
+                return error
+            page = 1
+        result = await self._search_page(url, page)
+        if not result.get("success"):
+            return result
+        next_cursor = None
+        if result["results"] and page < MAX_SEARCH_PAGES:
+            next_cursor = base64.urlsafe_b64encode(json.dumps({"u": url, "p": page + 1}).encode()).decode("ascii")
+        return {
+            "success": True,
+            "total_count": result["total_count"],
+            "page": page,
+            "returned_count": result["returned_count"],
+            "results": result["results"],
+            "next_cursor": next_cursor
+        }
+
+    async def _scrape_search(self, url: str, limit: Optional[int]) -> dict:
+        """One search results page via the HTTP engine, or Selenium as a fallback."""
+        logger.info(f"Searching: {url}")
+        result = await self._try_http(self._search_page_http, url, limit)
+        if result is not None:
+            return await self._index_result(result)
+
+        def _scrape(driver):
+            from .browser import By, EC, TimeoutException, WebDriverException, WebDriverWait
+
+            try:
+                self._load(driver, url)
+                with span("search_wait"):
+                    WebDriverWait(driver, 20).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, "products-i"))
+                    )
+
+                # All cards and the total count in one round trip
+                with span("search_extract"):
+                    page = driver.execute_script(SEARCH_RESULTS_JS, limit)
+                results = [listing_record(card) for card in page["results"]]
+                total_count = page["total_count"] or str(len(results))
                 
                 return {
                     "success": True,
@@ -360,6 +754,9 @@ class TurboAzScraper:
                     "error": "Page failed to load (timeout)",
                     "search_url": url
                 }
+            except WebDriverException:
+                # _run_browser replaces a crashed session and retries
+                raise
             except Exception as e:
                 return {
                     "success": False,
@@ -367,9 +764,29 @@ class TurboAzScraper:
                     "search_url": url
                 }
 
-        # Execute sync function in async
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _scrape)
+        return await self._index_result(await self._browser_result(_scrape))
+
+    async def _search_page_http(self, url: str, limit: int) -> dict:
+        """HTTP engine for one search results page. Raises ChallengeError when a browser is needed."""
+        html = await self.http.fetch(url)
+
+        def _parse():
+            with span("search_parse"):
+                page = parse_search_page(html, url, limit)
+                if page is None:
+                    return None, []
+                return page, [listing_record(card) for card in page["results"]]
+
+        page, results = await CPU_EXECUTOR.run(_parse)
+        if page is None:
+            raise ChallengeError(_unexpected_page(html, url))
+        return {
+            "success": True,
+            "total_count": page["total_count"],
+            "returned_count": len(results),
+            "search_url": url,
+            "results": results
+        }
     
     async def get_car_details(self, listing_id: str) -> dict:
         """Gets detailed information of a specific listing."""
@@ -380,174 +797,204 @@ class TurboAzScraper:
         else:
             url = f"{BASE_URL}/autos/{listing_id}"
         
+        listing_key = url.rstrip("/").split("/")[-1].split("-")[0]
+        return await self.cache.get_or_fetch("get_car_details", listing_key, lambda: self._scrape_details(url))
+
+    async def _scrape_details(self, url: str) -> dict:
+        """One listing page via the HTTP engine, or Selenium as a fallback."""
         logger.info(f"Fetching details: {url}")
+        result = await self._try_http(self._get_car_details_http, url)
+        if result is not None:
+            return await self._index_result(result)
         
-        def _scrape():
-            driver = self._get_driver()
-            
-            try:
-                driver.get(url)
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "product"))
-                )
-                
-                details = {"url": url}
-
-                # Title
-                try:
-                    title = driver.find_element(By.CLASS_NAME, "product-title")
-                    details["title"] = title.text.strip()
-                except NoSuchElementException:
-                    details["title"] = "N/A"
+        def _scrape(driver):
+            from .browser import By, EC, TimeoutException, WebDriverException, WebDriverWait
 
-                # Price (sidebar: product-price__i--bold)
-                try:
-                    price = driver.find_element(By.CSS_SELECTOR, ".product-price__i--bold")
-                    details["price"] = price.text.strip()
-                except NoSuchElementException:
-                    try:
-                        price = driver.find_element(By.CLASS_NAME, "product-price__i")
-                        details["price"] = price.text.strip()
-                    except NoSuchElementException:
-                        details["price"] = "N/A"
-
-                # Images (slider: product-photos__slider-top-i img)
-                try:
-                    images = driver.find_elements(By.CSS_SELECTOR, ".product-photos__slider-top-i img")
-                    details["images"] = [img.get_attribute("src") for img in images if img.get_attribute("src")]
-                except NoSuchElementException:
-                    details["images"] = []
-
-                # Specifications
-                details["specs"] = {}
-                try:
-                    props = driver.find_elements(By.CLASS_NAME, "product-properties__i")
-                    for prop in props:
-                        try:
-                            label = prop.find_element(By.CLASS_NAME, "product-properties__i-name").text.strip()
-                            value = prop.find_element(By.CLASS_NAME, "product-properties__i-value").text.strip()
-                            details["specs"][label] = value
-                        except NoSuchElementException:
-                            continue
-                except NoSuchElementException:
-                    pass
-
-                # Description (product-description__content)
-                try:
-                    desc = driver.find_element(By.CLASS_NAME, "product-description__content")
-                    details["description"] = desc.text.strip()
-                except NoSuchElementException:
-                    details["description"] = ""
-
-                # Seller information (product-owner__info)
-                try:
-                    seller_name = driver.find_element(By.CLASS_NAME, "product-owner__info-name")
-                    details["seller_name"] = seller_name.text.strip()
-                except NoSuchElementException:
-                    pass
-                try:
-                    region = driver.find_element(By.CLASS_NAME, "product-owner__info-region")
-                    details["city"] = region.text.strip()
-                except NoSuchElementException:
-                    pass
-                
-                try:
-                    phones = driver.find_elements(By.CSS_SELECTOR, ".product-phones__i a, .js-phones-hidden-block a")
-                    details["phones"] = [p.text.strip() for p in phones if p.text.strip()]
-                except NoSuchElementException:
-                    details["phones"] = []
+            try:
+                self._load(driver, url)
+                with span("details_wait"):
+                    WebDriverWait(driver, 20).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, "product"))
+                    )
 
-                # Statistics: Updated, View count (product-statistics__i)
-                try:
-                    stat_items = driver.find_elements(By.CSS_SELECTOR, ".product-statistics__i .product-statistics__i-text")
-                    for s in stat_items:
-                        t = s.text.strip()
-                        if "Yeniləndi:" in t or "yeniləndi" in t.lower():
-                            details["posted_date"] = t
-                        elif "Baxışların" in t or "baxış" in t.lower():
-                            details["views"] = t
-                except NoSuchElementException:
-                    pass
+                with span("details_extract"):
+                    details = details_record(driver.execute_script(DETAILS_JS, url))
                 
                 return {"success": True, "details": details}
                 
             except TimeoutException:
                 return {"success": False, "error": "Page failed to load"}
+            except WebDriverException:
+                # _run_browser replaces a crashed session and retries
+                raise
             except Exception as e:
                 return {"success": False, "error": str(e)}
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _scrape)
+        return await self._index_result(await self._browser_result(_scrape))
+
+    async def _get_car_details_http(self, url: str) -> dict:
+        """HTTP engine for get_car_details. Raises ChallengeError when a browser is needed."""
+        html = await self.http.fetch(url)
+
+        def _parse():
+            with span("details_parse"):
+                details = parse_details_page(html, url)
+                return None if details is None else details_record(details)
+
+        details = await CPU_EXECUTOR.run(_parse)
+        if details is None:
+            raise ChallengeError(_unexpected_page(html, url))
+        return {"success": True, "details": details}
     
-    async def get_makes_models(self, make: Optional[str] = None) -> dict:
-        """Gets available makes and models."""
-        
-        url = f"{BASE_URL}/autos"
-        
-        def _scrape():
-            driver = self._get_driver()
-            
+    async def get_car_details_many(self, listing_ids: list[str], concurrency: int = DETAILS_BATCH_CONCURRENCY) -> dict:
+        """
+        Gets details of several listings concurrently (at most `concurrency` at a time).
+        A failed listing does not fail the batch: each item carries its own success/error.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        # Single get_car_details calls go ahead of the batch's fetches
+        with priority(Priority.BULK):
+            items = await asyncio.gather(*(self._details_item(str(lid), semaphore) for lid in listing_ids))
+        succeeded = sum(1 for item in items if item.get("success"))
+        return {
+            "success": succeeded > 0 or not items,
+            "requested": len(items),
+            "succeeded": succeeded,
+            "results": items
+        }
+    
+    async def stream_car_details(
+        self, listing_ids: list[str], concurrency: int = DETAILS_BATCH_CONCURRENCY
+    ) -> AsyncIterator[dict]:
+        """get_car_details_many yielding each item (listing_id plus its result) as soon as it is done, in completion order."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        with priority(Priority.BULK):
+            tasks = [asyncio.ensure_future(self._details_item(str(lid), semaphore)) for lid in listing_ids]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _details_item(self, listing_id: str, semaphore: asyncio.Semaphore) -> dict:
+        async with semaphore:
             try:
-                driver.get(url)
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"]'))
-                )
-                time.sleep(0.5)
-                try:
-                    driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"] .tz-dropdown__selected').click()
-                    time.sleep(0.4)
-                except Exception:
-                    pass
-                if make:
-                    make_opts = self._parse_tz_dropdown_options(driver, "q_make")
-                    make_lower = make.strip().lower()
-                    make_id = None
-                    for val, label in make_opts:
-                        if label.lower() == make_lower or make_lower in label.lower():
-                            make_id = val
-                            break
-                    if not make_id:
-                        return {"success": False, "error": f"Make not found: {make}"}
-                    try:
-                        make_cont = driver.find_element(By.CSS_SELECTOR, '.tz-dropdown[data-id="q_make"]')
-                        make_cont.find_element(By.CSS_SELECTOR, ".tz-dropdown__selected").click()
-                        time.sleep(0.3)
-                        for el in make_cont.find_elements(By.CSS_SELECTOR, ".tz-dropdown__list .tz-dropdown__option"):
-                            if (el.get_attribute("data-val") or "").strip() == make_id:
-                                el.click()
-                                break
-                        time.sleep(0.5)
-                    except Exception:
-                        pass
-                    model_opts = self._parse_tz_dropdown_options(driver, "q_model")
-                    models = [label for _, label in model_opts]
-                    return {"success": True, "make": make, "models": models}
-                
-                make_opts = self._parse_tz_dropdown_options(driver, "q_make")
-                makes = [label for _, label in make_opts]
-                return {"success": True, "makes": makes}
-                
-            except TimeoutException:
-                return {"success": False, "error": "Page failed to load"}
+                result = await self.get_car_details(listing_id)
             except Exception as e:
-                return {"success": False, "error": str(e)}
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _scrape)
+                result = {"success": False, "error": str(e)}
+        return {"listing_id": listing_id, **result}
+
+    async def get_makes_models(self, make: Optional[str] = None) -> dict:
+        """Gets available makes and models (served from the make/model catalog)."""
+        try:
+            if not make:
+                await self._ensure_makes()
+                return {"success": True, "makes": self.catalog.make_labels()}
+            make_id, _ = await self._resolve_ids(make, None)
+            if not make_id:
+                return {"success": False, "error": f"Make not found: {make}"}
+            await self._ensure_models(make_id)
+            return {"success": True, "make": make, "models": self.catalog.model_labels(make_id)}
+        except (FetchError, PoolTimeout, SchedulerError) as e:
+            return {"success": False, "error": str(e)}
+    
+    async def query_listings(
+        self,
+        filters: Optional[dict] = None,
+        sort: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+        group_by: Optional[list[str]] = None,
+        currency: str = "AZN",
+    ) -> dict:
+        """
+        Filters, sorts or aggregates the listings seen so far (local index, no site requests).
+        With group_by, returns per-group counts and price statistics instead of listings.
+        """
+        if self.index is None:
+            return {"success": False, "error": "Listing index is disabled (TURBOAZ_INDEX=0)"}
+        index = self.index
+
+        def _run() -> dict:
+            if group_by:
+                result = index.aggregate(filters, group_by, currency)
+            else:
+                result = index.query(filters, sort, limit, offset)
+            return {"success": True, "indexed_count": index.count(), **result}
+
+        try:
+            return await CPU_EXECUTOR.run(_run)
+        except (ValueError, sqlite3.Error) as e:
+            return {"success": False, "error": str(e)}
     
+    async def get_new_since(self, cursor: Optional[str] = None, limit: int = 50) -> dict:
+        """Listings new or changed since a cursor (incremental crawl of the newest listings)."""
+        if self.feed is None:
+            return {"success": False, "error": "Listing index is disabled (TURBOAZ_INDEX=0)"}
+        try:
+            return await self.feed.get_new_since(cursor, limit)
+        except sqlite3.Error as e:
+            return {"success": False, "error": str(e)}
+
+    async def get_price_history(self, listing_id: str, changes_only: bool = False) -> dict:
+        """Recorded price/views observations of one listing (ID or URL)."""
+        if self.history is None:
+            return {"success": False, "error": "Price history is disabled (TURBOAZ_HISTORY=0)"}
+        listing_key = listing_id.rstrip("/").split("/")[-1].split("-")[0]
+        if not listing_key.isdigit():
+            return {"success": False, "error": f"Invalid listing ID: {listing_id}"}
+        try:
+            result = await CPU_EXECUTOR.run(self.history.get, listing_key, changes_only)
+        except sqlite3.Error as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True, **result}
+
     async def get_trending(self, category: str = "new", limit: int = 20) -> dict:
-        """Gets newest/popular listings."""
-        
-        if category == "vip":
-            url = f"{BASE_URL}/autos?q[extras][]=vip"
-        elif category == "popular":
-            url = f"{BASE_URL}/autos?order=view_count"
-        else:  # new
-            url = f"{BASE_URL}/autos"
-
-        # Use search_cars function
-        return await self.search_cars(limit=limit)
+        """
+        Gets newest/popular/VIP listings from the category page (unknown categories: new).
+        One cached result per category, kept fresh by a background refresh while it is requested.
+        """
+        if category not in TRENDING_URLS:
+            category = "new"
+        limit = max(1, limit)
+        size = max(limit, self._trending.get(category, (0, 0.0))[0])
+        self._trending[category] = (size, time.monotonic())
+        self._start_trending_refresh()
+        result = await self.cache.get_or_fetch(
+            "get_trending", f"{category}:{size}", lambda: self._fetch_trending(category, size)
+        )
+        if not result.get("success"):
+            return result
+        results = result["results"][:limit]
+        return {**result, "category": category, "returned_count": len(results), "results": results}
+
+    async def _fetch_trending(self, category: str, size: int) -> dict:
+        return await self._collect_search(TRENDING_URLS[category], size)
+
+    def _start_trending_refresh(self) -> None:
+        """Starts the background trending refresh task once per event loop."""
+        if TRENDING_REFRESH > 0 and (self._trending_task is None or self._trending_task.done()):
+            self._trending_task = asyncio.get_running_loop().create_task(self._refresh_trending_loop())
+
+    async def _refresh_trending_loop(self) -> None:
+        """Re-fetches every recently requested trending category and replaces its cached result."""
+        with background():
+            while True:
+                await asyncio.sleep(TRENDING_REFRESH)
+                now = time.monotonic()
+                for category, (size, requested_at) in list(self._trending.items()):
+                    if now - requested_at > TRENDING_IDLE:
+                        del self._trending[category]
+                        continue
+                    try:
+                        result = await self._fetch_trending(category, size)
+                    except Exception as e:
+                        logger.warning("Trending refresh (%s) failed: %s", category, e)
+                        continue
+                    if result.get("success"):
+                        await self.cache.put("get_trending", f"{category}:{size}", result)
     
     def __del__(self):
-        """Destructor - closes driver."""
+        """Destructor - closes pooled drivers."""
         self._close_driver()
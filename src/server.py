@@ -6,18 +6,25 @@ Uses Selenium because turbo.az blocks external access.
 """
 
 import asyncio
-import base64
-import io
-import json
+import contextvars
 import logging
-from typing import Any
-import aiohttp
-from PIL import Image
+import os
+import signal
+import threading
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, ImageContent
 
-from .scraper import TurboAzScraper
+from .metrics import ERRORS, TOOL_CALLS, TOOL_LATENCY, log_summary, span
+from .models import project, to_json
+from .scheduler import deadline
+
+if TYPE_CHECKING:
+    from .images import ImagePipeline
+    from .scraper import TurboAzScraper
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -26,8 +33,67 @@ logger = logging.getLogger("turbo-az-mcp")
 # Create MCP Server
 server = Server("turbo-az-mcp")
 
-# Scraper instance
-scraper = TurboAzScraper()
+# Scraper and image pipeline are created on first use, so initialize/list_tools
+# never wait for aiohttp, Selenium or Pillow to import.
+_scraper: Optional["TurboAzScraper"] = None
+_images: Optional["ImagePipeline"] = None
+_init_lock = threading.Lock()
+_shutdown_task: Optional[asyncio.Future] = None
+
+
+def _get_scraper() -> "TurboAzScraper":
+    """The shared scraper instance (imports the scraping stack on first call)."""
+    global _scraper
+    if _scraper is None:
+        with _init_lock:
+            if _scraper is None:
+                from .scraper import TurboAzScraper
+                _scraper = TurboAzScraper()
+    return _scraper
+
+
+def _get_images() -> "ImagePipeline":
+    """The shared image download/resize pipeline (imports Pillow on first call)."""
+    global _images
+    if _images is None:
+        with _init_lock:
+            if _images is None:
+                from .images import ImagePipeline
+                _images = ImagePipeline()
+    return _images
+
+
+def is_ready() -> bool:
+    """True once the startup warm-up has finished."""
+    return _scraper is not None and _scraper.ready.is_set()
+
+
+async def warm_up() -> None:
+    """Imports and creates the scraper off the event loop (on the CPU executor), then runs its warm-up."""
+    from .executors import CPU_EXECUTOR
+    scraper = await CPU_EXECUTOR.run(_get_scraper)
+    await scraper.warm_up()
+
+
+async def shutdown() -> None:
+    """
+    Graceful shutdown: closes the scraper (running browser calls get a grace period) and the
+    image pipeline, then drains the CPU executor. Later calls wait for the first one.
+    """
+    global _shutdown_task
+    if _shutdown_task is None:
+        _shutdown_task = asyncio.ensure_future(_close_all())
+    await _shutdown_task
+
+
+async def _close_all() -> None:
+    if _scraper is not None:
+        await _scraper.close()
+    if _images is not None:
+        await _images.close()
+    if _scraper is not None or _images is not None:
+        from .executors import CPU_EXECUTOR
+        await CPU_EXECUTOR.shutdown()
 
 
 async def fetch_image_as_base64(url: str, max_width: int = 800, quality: int = 70) -> tuple[str, str] | None:
@@ -40,44 +106,89 @@ async def fetch_image_as_base64(url: str, max_width: int = 800, quality: int = 7
         max_width: Maximum width in pixels (default: 800)
         quality: JPEG quality 1-100 (default: 70)
     """
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 200:
-                    image_bytes = await response.read()
-
-                    # Open image with PIL
-                    img = Image.open(io.BytesIO(image_bytes))
-
-                    # Convert RGBA to RGB if necessary (for JPEG compatibility)
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'P':
-                            img = img.convert('RGBA')
-                        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                        img = background
-
-                    # Resize if image is larger than max_width
-                    if img.width > max_width:
-                        ratio = max_width / img.width
-                        new_height = int(img.height * ratio)
-                        img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-
-                    # Compress and save to bytes
-                    output = io.BytesIO()
-                    img.save(output, format='JPEG', quality=quality, optimize=True)
-                    compressed_bytes = output.getvalue()
-
-                    # Encode to base64
-                    base64_data = base64.b64encode(compressed_bytes).decode('utf-8')
-
-                    return base64_data, 'image/jpeg'
-                else:
-                    logger.warning(f"Failed to fetch image {url}: HTTP {response.status}")
-                    return None
-    except Exception as e:
-        logger.warning(f"Error fetching image {url}: {e}")
-        return None
+    return await _get_images().fetch(url, max_width=max_width, quality=quality)
+
+
+# Seconds between metrics summaries in the log (the stdio server has no /metrics); 0 disables.
+METRICS_LOG_INTERVAL = float(os.environ.get("TURBOAZ_METRICS_LOG", "0"))
+
+# Outcome of the tool call running in the current task: "ok", "error" or "exception"
+_tool_outcome: contextvars.ContextVar[str] = contextvars.ContextVar("tool_outcome", default="ok")
+
+# Seconds a tool call's fetches may wait for their turn; later ones are dropped (0 = no deadline).
+TOOL_DEADLINE = float(os.environ.get("TURBOAZ_TOOL_DEADLINE", "120"))
+
+# Max listings per get_car_details_batch call
+MAX_BATCH_LISTINGS = 20
+
+# Max photos per listing returned by get_car_details_batch
+MAX_IMAGES_PER_LISTING = 10
+
+# Filters of query_listings (local index) -> argument names
+QUERY_FILTERS = (
+    "make", "model", "city", "currency", "price_min", "price_max", "year_min", "year_max",
+    "mileage_min", "mileage_max", "engine_min", "engine_max", "posted_since", "specs",
+)
+
+# Filter arguments of search_cars
+SEARCH_FILTERS = ("make", "model", "price_min", "price_max", "year_min", "year_max", "fuel_type", "transmission")
+
+# Filter parameters shared by the search tools
+SEARCH_FILTER_PROPERTIES = {
+    "make": {
+        "type": "string",
+        "description": "Car make (e.g. BMW, Mercedes, Toyota)"
+    },
+    "model": {
+        "type": "string",
+        "description": "Car model (e.g. X5, E-Class, Camry)"
+    },
+    "price_min": {
+        "type": "integer",
+        "description": "Minimum price (AZN)"
+    },
+    "price_max": {
+        "type": "integer",
+        "description": "Maximum price (AZN)"
+    },
+    "year_min": {
+        "type": "integer",
+        "description": "Minimum year of manufacture"
+    },
+    "year_max": {
+        "type": "integer",
+        "description": "Maximum year of manufacture"
+    },
+    "fuel_type": {
+        "type": "string",
+        "description": "Fuel type: petrol, diesel, gas, electric, hybrid"
+    },
+    "transmission": {
+        "type": "string",
+        "description": "Transmission: automatic, manual"
+    },
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": (
+            "Only return these fields of each listing (id is always included), e.g. "
+            "[\"title\", \"price\", \"currency\", \"year\"]. Fields: id, url, title, image, price, currency, "
+            "year, engine_l, mileage_km, city, date, raw (display strings). Default: all."
+        )
+    },
+}
+
+
+# Streaming switch of the search and batch tools
+STREAM_PROPERTY = {
+    "type": "boolean",
+    "description": (
+        "Send results as progress notifications as they arrive (each results page, or each listing of a batch) "
+        "and end with a summary without them. Needs a progressToken on the request; without one the full result "
+        "is returned as usual (default: false)"
+    ),
+    "default": False
+}
 
 
 @server.list_tools()
@@ -90,42 +201,26 @@ async def list_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "make": {
-                        "type": "string",
-                        "description": "Car make (e.g. BMW, Mercedes, Toyota)"
-                    },
-                    "model": {
-                        "type": "string",
-                        "description": "Car model (e.g. X5, E-Class, Camry)"
-                    },
-                    "price_min": {
-                        "type": "integer",
-                        "description": "Minimum price (AZN)"
-                    },
-                    "price_max": {
-                        "type": "integer",
-                        "description": "Maximum price (AZN)"
-                    },
-                    "year_min": {
-                        "type": "integer",
-                        "description": "Minimum year of manufacture"
-                    },
-                    "year_max": {
-                        "type": "integer",
-                        "description": "Maximum year of manufacture"
-                    },
-                    "fuel_type": {
-                        "type": "string",
-                        "description": "Fuel type: petrol, diesel, gas, electric, hybrid"
-                    },
-                    "transmission": {
-                        "type": "string",
-                        "description": "Transmission: automatic, manual"
-                    },
+                    **SEARCH_FILTER_PROPERTIES,
                     "limit": {
                         "type": "integer",
                         "description": "Result count limit (default: 20)",
                         "default": 20
+                    },
+                    "stream": STREAM_PROPERTY
+                }
+            }
+        ),
+        Tool(
+            name="search_cars_paged",
+            description="Car search on Turbo.az one results page at a time. Pass next_cursor from the previous call to get the next page.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    **SEARCH_FILTER_PROPERTIES,
+                    "cursor": {
+                        "type": "string",
+                        "description": "next_cursor from a previous call (filters are then ignored). Omit to start a new search."
                     }
                 }
             }
@@ -144,6 +239,35 @@ async def list_tools() -> list[Tool]:
                 "required": ["listing_id"]
             }
         ),
+        Tool(
+            name="get_car_details_batch",
+            description="Fetches details of several Turbo.az listings at once (e.g. to compare cars). Failed listings are reported per item.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "listing_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Listing IDs or full URLs",
+                        "maxItems": MAX_BATCH_LISTINGS
+                    },
+                    "include_images": {
+                        "type": "boolean",
+                        "description": "Also return photos of each listing (default: false)",
+                        "default": False
+                    },
+                    "images_per_listing": {
+                        "type": "integer",
+                        "description": f"Photos per listing when include_images is set (default: 3, max {MAX_IMAGES_PER_LISTING})",
+                        "default": 3,
+                        "minimum": 0,
+                        "maximum": MAX_IMAGES_PER_LISTING
+                    },
+                    "stream": STREAM_PROPERTY
+                },
+                "required": ["listing_ids"]
+            }
+        ),
         Tool(
             name="get_makes_models",
             description="Fetches list of available makes and models on Turbo.az.",
@@ -157,6 +281,95 @@ async def list_tools() -> list[Tool]:
                 }
             }
         ),
+        Tool(
+            name="query_listings",
+            description=(
+                "Queries listings already seen by search_cars/get_car_details (local index, no site requests). "
+                "Filters on mileage, city, engine volume and detail-page specs the site search cannot, sorts "
+                "(e.g. by price per year) and aggregates (median price by model/year, counts by city). "
+                "Run a search first to fill the index."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "make": {"type": "string", "description": "Make name (e.g. BMW)"},
+                    "model": {"type": "string", "description": "Model name; also matches variants (X5 -> X5 M)"},
+                    "city": {"type": "string", "description": "City (e.g. Bakı)"},
+                    "currency": {"type": "string", "description": "Only listings priced in this currency: AZN, USD, EUR"},
+                    "price_min": {"type": "integer", "description": "Minimum price"},
+                    "price_max": {"type": "integer", "description": "Maximum price"},
+                    "year_min": {"type": "integer", "description": "Minimum year of manufacture"},
+                    "year_max": {"type": "integer", "description": "Maximum year of manufacture"},
+                    "mileage_min": {"type": "integer", "description": "Minimum mileage (km)"},
+                    "mileage_max": {"type": "integer", "description": "Maximum mileage (km)"},
+                    "engine_min": {"type": "number", "description": "Minimum engine volume (L)"},
+                    "engine_max": {"type": "number", "description": "Maximum engine volume (L)"},
+                    "posted_since": {"type": "string", "description": "Only listings posted on or after this date (YYYY-MM-DD)"},
+                    "specs": {
+                        "type": "object",
+                        "additionalProperties": {"type": "string"},
+                        "description": "Detail page properties that must contain the given text, e.g. {\"Sürətlər qutusu\": \"Avtomat\"} (only listings opened with get_car_details have specs)"
+                    },
+                    "sort": {
+                        "type": "string",
+                        "description": "Sort key: price, year, mileage, engine, date, views, price_per_year (price / age in years); prefix with - for descending"
+                    },
+                    "limit": {"type": "integer", "description": "Max listings (default: 20, max 500)", "default": 20},
+                    "offset": {"type": "integer", "description": "Listings to skip (default: 0)", "default": 0},
+                    "group_by": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["make", "model", "year", "city", "currency"]},
+                        "description": "Return per-group count and median/min/max price instead of listings"
+                    },
+                    "fields": SEARCH_FILTER_PROPERTIES["fields"],
+                }
+            }
+        ),
+        Tool(
+            name="get_new_since",
+            description=(
+                "Listings that are new or changed (price, bumped/edited date) since a cursor. Crawls the newest "
+                "listings incrementally, stopping at already-seen ones, so polling is cheap. Pass next_cursor "
+                "from the previous call; omit it for everything recorded so far."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cursor": {
+                        "type": "string",
+                        "description": "next_cursor from a previous call"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Max listings (default: 50, max 200)",
+                        "default": 50
+                    },
+                    "fields": SEARCH_FILTER_PROPERTIES["fields"],
+                }
+            }
+        ),
+        Tool(
+            name="get_price_history",
+            description=(
+                "Price and view-count history of one listing, from every time it was seen by the other tools "
+                "(search results, details, change feed). Returns observations oldest first with first/last/min/max price."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "listing_id": {
+                        "type": "string",
+                        "description": "Listing ID (e.g. 1234567) or full URL"
+                    },
+                    "changes_only": {
+                        "type": "boolean",
+                        "description": "Only observations where price, currency or views changed (default: false)",
+                        "default": False
+                    }
+                },
+                "required": ["listing_id"]
+            }
+        ),
         Tool(
             name="get_trending",
             description="Fetches most popular/new listings on Turbo.az.",
@@ -179,79 +392,278 @@ async def list_tools() -> list[Tool]:
     ]
 
 
+def _to_json(result: Any) -> str:
+    """Serializes a tool result; a result with success=False marks the call as an error."""
+    if isinstance(result, dict) and result.get("success") is False:
+        _tool_outcome.set("error")
+    with span("serialize"):
+        return to_json(result)
+
+
+def _project_results(result: dict, fields: Optional[list[str]]) -> dict:
+    """Search result with each listing cut down to the requested fields."""
+    if not fields or not result.get("results"):
+        return result
+    return {**result, "results": [project(car, fields) for car in result["results"]]}
+
+
+def _progress_sender() -> Optional[Callable[[dict, float, Optional[float]], Awaitable[None]]]:
+    """
+    Function sending a chunk of the current tool call's result as a progress notification
+    (on the call's own response stream), or None when the call has no progressToken.
+    """
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+    token = ctx.meta.progressToken if ctx.meta is not None else None
+    if token is None:
+        return None
+
+    async def send(chunk: dict, progress: float, total: Optional[float]) -> None:
+        with span("serialize"):
+            message = to_json(chunk)
+        await ctx.session.send_progress_notification(
+            token, progress, total, message=message, related_request_id=ctx.request_id
+        )
+
+    return send
+
+
+async def _stream_search(filters: dict, limit: int, fields: Optional[list[str]], send) -> dict:
+    """search_cars sending each results page as it is parsed; returns a summary without the listings."""
+    summary = {"success": True, "streamed": True, "total_count": None, "returned_count": 0, "pages": 0}
+    async with aclosing(_get_scraper().stream_search(**filters, limit=limit)) as pages:
+        async for page in pages:
+            if not page.get("success"):
+                return page
+            summary["total_count"] = page["total_count"]
+            summary["search_url"] = page["search_url"]
+            summary["returned_count"] += page["returned_count"]
+            summary["pages"] += 1
+            await send(_project_results(page, fields), summary["returned_count"], limit)
+    return summary
+
+
+async def _stream_batch(listing_ids: list[str], per_listing: int, send) -> tuple[dict, list[tuple[str, list[str]]]]:
+    """
+    get_car_details_batch sending each listing's details as they arrive.
+    Returns:
+        summary (per item only listing_id, success and error) and (listing_id, photo URLs) to attach.
+    """
+    items, with_images = [], []
+    async with aclosing(_get_scraper().stream_car_details(listing_ids)) as results:
+        async for item in results:
+            items.append({key: item[key] for key in ("listing_id", "success", "error") if key in item})
+            if per_listing and item.get("success") and item["details"].get("images"):
+                with_images.append((item["listing_id"], item["details"]["images"][:per_listing]))
+            await send(item, len(items), len(listing_ids))
+    succeeded = sum(1 for item in items if item["success"])
+    summary = {
+        "success": succeeded > 0 or not items,
+        "streamed": True,
+        "requested": len(items),
+        "succeeded": succeeded,
+        "results": items
+    }
+    return summary, with_images
+
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-    """Executes tool calls."""
+    """Executes tool calls, recording latency and outcome per tool."""
     logger.info(f"Tool called: {name} with args: {arguments}")
-    
+    _tool_outcome.set("ok")
+    start = time.perf_counter()
     try:
-        if name == "search_cars":
-            results = await scraper.search_cars(
-                make=arguments.get("make"),
-                model=arguments.get("model"),
-                price_min=arguments.get("price_min"),
-                price_max=arguments.get("price_max"),
-                year_min=arguments.get("year_min"),
-                year_max=arguments.get("year_max"),
-                fuel_type=arguments.get("fuel_type"),
-                transmission=arguments.get("transmission"),
-                limit=arguments.get("limit", 20)
-            )
-
-            # Return only text results (no images to avoid confusion about which image belongs to which car)
-            return [TextContent(type="text", text=json.dumps(results, ensure_ascii=False, indent=2))]
-        
-        elif name == "get_car_details":
-            listing_id = arguments.get("listing_id")
-            if not listing_id:
-                return [TextContent(type="text", text="Error: listing_id is required")]
-
-            details = await scraper.get_car_details(listing_id)
-
-            # Fetch images and include them as ImageContent
-            content_list = [TextContent(type="text", text=json.dumps(details, ensure_ascii=False, indent=2))]
-
-            if details.get("success") and details.get("details", {}).get("images"):
-                image_urls = details["details"]["images"]
-                # Fetch up to 10 compressed images (quality=50 for smaller size)
-                for img_url in image_urls[:10]:
-                    img_data = await fetch_image_as_base64(img_url, quality=50)
-                    if img_data:
-                        base64_data, mime_type = img_data
-                        content_list.append(
-                            ImageContent(
-                                type="image",
-                                data=base64_data,
-                                mimeType=mime_type
-                            )
+        with deadline(TOOL_DEADLINE):
+            content = await _dispatch_tool(name, arguments)
+        if content and getattr(content[0], "text", "").startswith(("Error:", "Unknown tool:")):
+            _tool_outcome.set("error")
+        return content
+    except Exception as e:
+        _tool_outcome.set("exception")
+        ERRORS.inc(stage="tool", type=type(e).__name__)
+        logger.error(f"Tool error: {e}")
+        return [TextContent(type="text", text=f"An error occurred: {str(e)}")]
+    finally:
+        TOOL_LATENCY.observe(time.perf_counter() - start, tool=name)
+        TOOL_CALLS.inc(tool=name, outcome=_tool_outcome.get())
+
+
+async def _dispatch_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+    """Runs one tool."""
+    if name == "search_cars":
+        filters = {key: arguments.get(key) for key in SEARCH_FILTERS}
+        send = _progress_sender() if arguments.get("stream") else None
+        if send is not None:
+            results = await _stream_search(filters, arguments.get("limit", 20), arguments.get("fields"), send)
+            return [TextContent(type="text", text=_to_json(results))]
+        results = await _get_scraper().search_cars(**filters, limit=arguments.get("limit", 20))
+        results = _project_results(results, arguments.get("fields"))
+
+        # Return only text results (no images to avoid confusion about which image belongs to which car)
+        return [TextContent(type="text", text=_to_json(results))]
+    
+    elif name == "search_cars_paged":
+        results = await _get_scraper().search_cars_paged(
+            cursor=arguments.get("cursor"),
+            make=arguments.get("make"),
+            model=arguments.get("model"),
+            price_min=arguments.get("price_min"),
+            price_max=arguments.get("price_max"),
+            year_min=arguments.get("year_min"),
+            year_max=arguments.get("year_max"),
+            fuel_type=arguments.get("fuel_type"),
+            transmission=arguments.get("transmission"),
+        )
+        results = _project_results(results, arguments.get("fields"))
+        return [TextContent(type="text", text=_to_json(results))]
+    
+    elif name == "get_car_details":
+        listing_id = arguments.get("listing_id")
+        if not listing_id:
+            return [TextContent(type="text", text="Error: listing_id is required")]
+
+        details = await _get_scraper().get_car_details(listing_id)
+
+        # Fetch images and include them as ImageContent
+        content_list = [TextContent(type="text", text=_to_json(details))]
+
+        if details.get("success") and details.get("details", {}).get("images"):
+            image_urls = details["details"]["images"]
+            # Fetch up to 10 compressed images concurrently (quality=50 for smaller size)
+            for img_data in await _get_images().fetch_many(image_urls[:10], quality=50):
+                if img_data:
+                    base64_data, mime_type = img_data
+                    content_list.append(
+                        ImageContent(
+                            type="image",
+                            data=base64_data,
+                            mimeType=mime_type
                         )
+                    )
+
+        return content_list
+    
+    elif name == "get_car_details_batch":
+        listing_ids = arguments.get("listing_ids") or []
+        if not listing_ids:
+            return [TextContent(type="text", text="Error: listing_ids is required")]
+        if len(listing_ids) > MAX_BATCH_LISTINGS:
+            return [TextContent(type="text", text=f"Error: at most {MAX_BATCH_LISTINGS} listing_ids per call")]
 
-            return content_list
-        
-        elif name == "get_makes_models":
-            make = arguments.get("make")
-            results = await scraper.get_makes_models(make)
-            return [TextContent(type="text", text=json.dumps(results, ensure_ascii=False, indent=2))]
-        
-        elif name == "get_trending":
-            category = arguments.get("category", "new")
-            limit = arguments.get("limit", 20)
-            results = await scraper.get_trending(category, limit)
-            return [TextContent(type="text", text=json.dumps(results, ensure_ascii=False, indent=2))]
-        
+        per_listing = 0
+        if arguments.get("include_images"):
+            try:
+                per_listing = max(0, min(int(arguments.get("images_per_listing", 3)), MAX_IMAGES_PER_LISTING))
+            except (ValueError, TypeError):
+                error = f"images_per_listing must be an integer, got {arguments.get('images_per_listing')!r}"
+                return [TextContent(type="text", text=_to_json({"success": False, "error": error}))]
+        send = _progress_sender() if arguments.get("stream") else None
+        if send is not None:
+            batch, with_images = await _stream_batch(listing_ids, per_listing, send)
         else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
+            batch = await _get_scraper().get_car_details_many(listing_ids)
+            with_images = [
+                (item["listing_id"], item["details"]["images"][:per_listing]) for item in batch["results"]
+                if per_listing and item.get("success") and item["details"].get("images")
+            ]
+        content_list = [TextContent(type="text", text=_to_json(batch))]
+
+        if with_images:
+            fetched = await asyncio.gather(*(
+                _get_images().fetch_many(image_urls, quality=50) for _, image_urls in with_images
+            ))
+            for (listing_id, _), listing_images in zip(with_images, fetched):
+                # Label each group so it is clear which listing the photos belong to
+                content_list.append(TextContent(type="text", text=f"Photos of listing {listing_id}:"))
+                for img_data in listing_images:
+                    if img_data:
+                        base64_data, mime_type = img_data
+                        content_list.append(ImageContent(type="image", data=base64_data, mimeType=mime_type))
+
+        return content_list
     
-    except Exception as e:
-        logger.error(f"Tool error: {e}")
-        return [TextContent(type="text", text=f"An error occurred: {str(e)}")]
+    elif name == "get_makes_models":
+        make = arguments.get("make")
+        results = await _get_scraper().get_makes_models(make)
+        return [TextContent(type="text", text=_to_json(results))]
+    
+    elif name == "query_listings":
+        results = await _get_scraper().query_listings(
+            filters={key: arguments[key] for key in QUERY_FILTERS if arguments.get(key) is not None},
+            sort=arguments.get("sort"),
+            limit=arguments.get("limit", 20),
+            offset=arguments.get("offset", 0),
+            group_by=arguments.get("group_by"),
+            currency=arguments.get("currency") or "AZN",
+        )
+        results = _project_results(results, arguments.get("fields"))
+        return [TextContent(type="text", text=_to_json(results))]
+
+    elif name == "get_new_since":
+        results = await _get_scraper().get_new_since(arguments.get("cursor"), arguments.get("limit", 50))
+        results = _project_results(results, arguments.get("fields"))
+        return [TextContent(type="text", text=_to_json(results))]
+
+    elif name == "get_price_history":
+        listing_id = arguments.get("listing_id")
+        if not listing_id:
+            return [TextContent(type="text", text="Error: listing_id is required")]
+        results = await _get_scraper().get_price_history(str(listing_id), bool(arguments.get("changes_only")))
+        return [TextContent(type="text", text=_to_json(results))]
+
+    elif name == "get_trending":
+        category = arguments.get("category", "new")
+        limit = arguments.get("limit", 20)
+        results = await _get_scraper().get_trending(category, limit)
+        return [TextContent(type="text", text=_to_json(results))]
+    
+    else:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
+
+
+async def _log_metrics(interval: float) -> None:
+    """Logs the metrics summary every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        log_summary()
 
 
 async def main():
     """Starts the MCP server."""
     logger.info("Turbo.az MCP Server starting...")
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    reporter = asyncio.create_task(_log_metrics(METRICS_LOG_INTERVAL)) if METRICS_LOG_INTERVAL > 0 else None
+    # Launch browsers and load the catalog while the client is still connecting
+    warm_up_task = asyncio.create_task(warm_up())
+    # SIGTERM would end the process without the shutdown below (Chrome and profile dirs left behind)
+    main_task = asyncio.current_task()
+    terminated = asyncio.Event()
+
+    def _terminate() -> None:
+        terminated.set()
+        # The stdin reader thread only sees the cancellation at the next line or EOF: clean up now
+        asyncio.ensure_future(shutdown())
+        main_task.cancel()
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, _terminate)
+    except NotImplementedError:
+        pass
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    except asyncio.CancelledError:
+        if not terminated.is_set():
+            raise
+        logger.info("SIGTERM received, shutting down")
+    finally:
+        warm_up_task.cancel()
+        await shutdown()
+        if reporter is not None:
+            reporter.cancel()
+            log_summary()
 
 
 if __name__ == "__main__":
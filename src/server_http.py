@@ -3,25 +3,33 @@
 Turbo.az MCP Server (HTTP)
 Same server as stdio but over Streamable HTTP for Remote MCP server URL.
 Claude requires https: use cert.pem + key.pem in project root for HTTPS.
+TURBOAZ_HTTP_WORKERS > 1 runs several worker processes behind a session-affinity proxy (src/workers.py).
 """
 
+import argparse
 import asyncio
 import logging
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import AsyncIterator
 
 from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from starlette.routing import Route
 from starlette.types import Receive, Scope, Send
 
-from .server import server
+from .server import is_ready, server, shutdown, warm_up
+from .metrics import REGISTRY
+from .history import HISTORY_PATH, export_lines, export_rows, parse_since
+from .workers import HTTP_WORKERS
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("turbo-az-mcp")
 
-PORT = 8080
+PORT = int(os.environ.get("TURBOAZ_HTTP_PORT", "8080"))
 # Project root (parent of src/)
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _KEY = _PROJECT_ROOT / "key.pem"
@@ -51,31 +59,88 @@ class StreamableHTTPASGIApp:
         await self.session_manager.handle_request(scope, receive, send)
 
 
+async def metrics_endpoint(_request: Request) -> PlainTextResponse:
+    """Serve counters and latency histograms in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+async def ready_endpoint(_request: Request) -> JSONResponse:
+    """Readiness probe: 200 once startup warm-up has finished, 503 before."""
+    ready = is_ready()
+    return JSONResponse({"ready": ready}, status_code=200 if ready else 503)
+
+
+async def history_export_endpoint(request: Request):
+    """Stream the price history store as CSV or JSON Lines (?format=csv|jsonl&since=ISO date)."""
+    fmt = request.query_params.get("format", "csv")
+    if fmt not in ("csv", "jsonl"):
+        return JSONResponse({"error": "format must be csv or jsonl"}, status_code=400)
+    try:
+        since = parse_since(request.query_params.get("since"))
+    except ValueError:
+        return JSONResponse({"error": "since must be an ISO date or datetime"}, status_code=400)
+    if not HISTORY_PATH.exists():
+        return JSONResponse({"error": "no price history recorded yet"}, status_code=404)
+    media_type = "application/x-ndjson" if fmt == "jsonl" else "text/csv"
+    # Sync iterator: Starlette reads it in a worker thread
+    return StreamingResponse(export_lines(export_rows(since), fmt), media_type=media_type)
+
+
 def create_app() -> Starlette:
-    """Create Starlette app with Streamable HTTP at /mcp.
+    """Create Starlette app with Streamable HTTP at /mcp, Prometheus metrics at /metrics,
+    a readiness probe at /ready and the price history export at /history/export.
 
     Returns:
-        Starlette: App with route /mcp for MCP over HTTP.
+        Starlette: App with routes /mcp for MCP over HTTP, /metrics, /ready and /history/export.
     """
     session_manager = StreamableHTTPSessionManager(app=server)
     asgi_app = StreamableHTTPASGIApp(session_manager)
 
     @asynccontextmanager
     async def lifespan(_app: Starlette) -> AsyncIterator[None]:
-        async with session_manager.run():
-            yield
+        # Warm up in the background so the server accepts connections right away
+        warm_up_task = asyncio.create_task(warm_up())
+        try:
+            async with session_manager.run():
+                yield
+        finally:
+            warm_up_task.cancel()
+            await shutdown()
 
     return Starlette(
         routes=[
             Route("/mcp", endpoint=asgi_app),
             Route("/mcp/", endpoint=asgi_app),
+            Route("/metrics", endpoint=metrics_endpoint),
+            Route("/ready", endpoint=ready_endpoint),
+            Route("/history/export", endpoint=history_export_endpoint),
         ],
         lifespan=lifespan,
     )
 
 
+async def run_worker(port: int) -> None:
+    """Run one plain-HTTP worker on a loopback port (multi-worker mode; the proxy terminates TLS)."""
+    import uvicorn
+    config = uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning")
+    await uvicorn.Server(config).serve()
+
+
 async def main() -> None:
-    """Run MCP server over HTTP or HTTPS on port 8080. HTTPS if cert.pem + key.pem exist."""
+    """Run MCP server over HTTP or HTTPS on PORT (default 8080). HTTPS if cert.pem + key.pem exist."""
+    scheme = "https" if USE_HTTPS else "http"
+    if HTTP_WORKERS > 1:
+        import ssl
+        from .workers import serve
+
+        ssl_context = None
+        if USE_HTTPS:
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(str(_CERT), str(_KEY))
+        logger.info("Turbo.az MCP Server: %s://localhost:%s/mcp (%d workers)", scheme, PORT, HTTP_WORKERS)
+        await serve(PORT, HTTP_WORKERS, ssl_context)
+        return
+
     import uvicorn
     app = create_app()
     kwargs = {"host": "0.0.0.0", "port": PORT, "log_level": "info"}
@@ -84,7 +149,6 @@ async def main() -> None:
         kwargs["ssl_certfile"] = str(_CERT)
     config = uvicorn.Config(app, **kwargs)
     server_uv = uvicorn.Server(config)
-    scheme = "https" if USE_HTTPS else "http"
     logger.info("Turbo.az MCP Server: %s://localhost:%s/mcp", scheme, PORT)
     if not USE_HTTPS:
         logger.info("Claude requires https. Add cert.pem and key.pem to project root for HTTPS.")
@@ -92,4 +156,10 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Turbo.az MCP server over Streamable HTTP")
+    parser.add_argument("--worker-port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_worker(args.worker_port) if args.worker_port else main())
+    except KeyboardInterrupt:
+        pass
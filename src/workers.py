@@ -0,0 +1,302 @@
+"""
+Turbo.az MCP Server (HTTP, multi-worker)
+Runs N server_http worker processes on loopback ports behind a front proxy on the
+public port. Each worker has its own browser pool and thread pools; the proxy keeps
+MCP session affinity by routing on the mcp-session-id header. Workers share the
+response cache, catalog, listing index and price history through SQLite (WAL) and
+files in TURBOAZ_CACHE_DIR.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import ssl
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger("turbo-az-mcp")
+
+# Worker processes (1 = single-process server).
+HTTP_WORKERS = int(os.environ.get("TURBOAZ_HTTP_WORKERS", "1"))
+# Loopback port of worker 0; worker i listens on WORKER_BASE_PORT + i.
+WORKER_BASE_PORT = int(os.environ.get("TURBOAZ_WORKER_BASE_PORT", "18080"))
+# A worker that exits is restarted after this many seconds.
+WORKER_RESTART_DELAY = 1.0
+# Sessions without requests for this many seconds are ended (clients that left without a DELETE).
+SESSION_IDLE_TIMEOUT = float(os.environ.get("TURBOAZ_SESSION_IDLE_TIMEOUT", "3600"))
+
+SESSION_HEADER = "mcp-session-id"
+# Not forwarded in either direction.
+_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+    "transfer-encoding", "upgrade", "host", "content-length",
+}
+
+
+def _forward_headers(headers) -> dict:
+    return {k: v for k, v in headers.items() if k.lower() not in _HOP_HEADERS}
+
+
+class Worker:
+    """One server_http child process on a loopback port."""
+
+    def __init__(self, index: int, port: int):
+        self.index = index
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.process: Optional[subprocess.Popen] = None
+        self.sessions = 0
+
+    def start(self) -> None:
+        env = dict(os.environ)
+        env["TURBOAZ_HTTP_WORKERS"] = "1"
+        # Share cached tool results between workers unless configured otherwise, and one rate limit
+        # budget per host for all workers, not one each. Both SQLite backends run on threads of their
+        # own, so a worker waiting for a sibling's write lock does not stall its event loop.
+        env.setdefault("TURBOAZ_CACHE_BACKEND", "sqlite")
+        env.setdefault("TURBOAZ_RATE_LIMIT_BACKEND", "sqlite")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "src.server_http", "--worker-port", str(self.port)],
+            env=env,
+        )
+        logger.info("Worker %d started (pid %d, port %d)", self.index, self.process.pid, self.port)
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class SessionProxy:
+    """Front proxy: new sessions go to the worker with the fewest, later requests follow the session id."""
+
+    def __init__(self, workers: list[Worker], idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.workers = workers
+        self.idle_timeout = idle_timeout
+        self.routes: dict[str, Worker] = {}
+        # Per session: time.monotonic() of its last request, and requests (e.g. SSE streams) still open
+        self.last_seen: dict[str, float] = {}
+        self.open: dict[str, int] = {}
+        self._client: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        self._client = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=10),
+            auto_decompress=False,
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+
+    def forget(self, worker: Worker) -> None:
+        """Drops the routes of a worker's sessions (it restarted and lost them)."""
+        for sid in [sid for sid, w in self.routes.items() if w is worker]:
+            self.end_session(sid)
+        worker.sessions = 0
+
+    def end_session(self, sid: str) -> None:
+        """Drops a session's route and takes it off its worker's count."""
+        worker = self.routes.pop(sid, None)
+        self.last_seen.pop(sid, None)
+        self.open.pop(sid, None)
+        if worker is not None:
+            worker.sessions = max(0, worker.sessions - 1)
+
+    async def expire_idle(self) -> None:
+        """Ends sessions idle for longer than idle_timeout, on their workers too."""
+        if self.idle_timeout <= 0:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        for sid in [sid for sid, seen in self.last_seen.items() if seen < cutoff and not self.open.get(sid)]:
+            worker = self.routes.get(sid)
+            self.end_session(sid)
+            if worker is None:
+                continue
+            logger.info("Session %s idle, ending it on worker %d", sid, worker.index)
+            try:
+                async with self._client.delete(
+                    f"{worker.url}/mcp", headers={SESSION_HEADER: sid}, timeout=aiohttp.ClientTimeout(total=5)
+                ):
+                    pass
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+
+    async def mcp(self, request: web.Request) -> web.StreamResponse:
+        """Forwards /mcp to the session's worker, streaming the response (SSE included)."""
+        sid = request.headers.get(SESSION_HEADER)
+        if sid:
+            worker = self.routes.get(sid)
+            if worker is None:
+                # Unknown session (e.g. the proxy or its worker restarted): the client re-initializes
+                return web.json_response(
+                    {"jsonrpc": "2.0", "id": "server-error", "error": {"code": -32600, "message": "Session not found"}},
+                    status=404,
+                )
+            self.open[sid] = self.open.get(sid, 0) + 1
+            try:
+                return await self._forward(request, worker)
+            finally:
+                # Unless the request ended the session
+                if sid in self.routes:
+                    self.open[sid] = self.open.get(sid, 1) - 1
+                    self.last_seen[sid] = time.monotonic()
+        # New session: the least loaded worker, counted before its response arrives
+        # so that concurrent initializations spread out
+        worker = min(self.workers, key=lambda w: w.sessions)
+        worker.sessions += 1
+        response = await self._forward(request, worker)
+        if response.headers.get(SESSION_HEADER) is None:
+            worker.sessions = max(0, worker.sessions - 1)
+        return response
+
+    async def _forward(self, request: web.Request, worker: Worker) -> web.StreamResponse:
+        body = await request.read()
+        try:
+            upstream = await self._client.request(
+                request.method,
+                worker.url + str(request.rel_url),
+                headers=_forward_headers(request.headers),
+                data=body or None,
+                allow_redirects=False,
+            )
+        except aiohttp.ClientError as e:
+            logger.warning("Worker %d unreachable: %s", worker.index, e)
+            return web.json_response({"error": f"worker {worker.index} unavailable"}, status=502)
+        async with upstream:
+            sid = upstream.headers.get(SESSION_HEADER)
+            if sid and sid not in self.routes:
+                self.routes[sid] = worker
+                self.last_seen[sid] = time.monotonic()
+            requested = request.headers.get(SESSION_HEADER)
+            if requested and (upstream.status == 404 or (request.method == "DELETE" and upstream.status < 300)):
+                self.end_session(requested)
+            response = web.StreamResponse(status=upstream.status, headers=_forward_headers(upstream.headers))
+            await response.prepare(request)
+            try:
+                async for chunk in upstream.content.iter_any():
+                    await response.write(chunk)
+                await response.write_eof()
+            except ConnectionResetError:
+                # Client went away (e.g. closed its SSE stream)
+                pass
+            return response
+
+    async def ready(self, _request: web.Request) -> web.Response:
+        """Ready when every worker is."""
+        states = await asyncio.gather(*(self._worker_ready(w) for w in self.workers))
+        ready = all(states)
+        return web.json_response({"ready": ready, "workers": states}, status=200 if ready else 503)
+
+    async def _worker_ready(self, worker: Worker) -> bool:
+        try:
+            async with self._client.get(f"{worker.url}/ready", timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                return resp.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def metrics(self, _request: web.Request) -> web.Response:
+        """Metrics of all workers, each sample labelled with its worker index."""
+        texts = await asyncio.gather(*(self._worker_metrics(w) for w in self.workers))
+        return web.Response(text=merge_metrics(texts), content_type="text/plain", charset="utf-8")
+
+    async def _worker_metrics(self, worker: Worker) -> str:
+        try:
+            async with self._client.get(f"{worker.url}/metrics", timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                return await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return ""
+
+    async def other(self, request: web.Request) -> web.StreamResponse:
+        """Other routes (e.g. /history/export) read shared state, so any worker will do."""
+        return await self._forward(request, self.workers[0])
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/mcp", self.mcp)
+        app.router.add_route("*", "/mcp/", self.mcp)
+        app.router.add_get("/ready", self.ready)
+        app.router.add_get("/metrics", self.metrics)
+        app.router.add_route("*", "/{tail:.*}", self.other)
+        return app
+
+
+def _with_worker_label(line: str, index: int) -> str:
+    """Sample line with worker="index" added to its labels."""
+    label = f'worker="{index}"'
+    brace, space = line.find("{"), line.find(" ")
+    if brace != -1 and brace < space:
+        return f"{line[:brace + 1]}{label},{line[brace + 1:]}"
+    return f"{line[:space]}{{{label}}}{line[space:]}"
+
+
+def merge_metrics(texts: list[str]) -> str:
+    """Prometheus texts of several workers as one exposition, samples grouped by metric family."""
+    headers: dict[str, list[str]] = {}
+    samples: dict[str, list[str]] = {}
+    for index, text in enumerate(texts):
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# HELP "):
+                family = line.split(" ", 3)[2]
+                headers.setdefault(family, []).append(line)
+                samples.setdefault(family, [])
+            elif line.startswith("# TYPE "):
+                headers[family].append(line)
+            elif line and family is not None:
+                samples[family].append(_with_worker_label(line, index))
+    lines = []
+    for family, head in headers.items():
+        lines.extend(head[:2])
+        lines.extend(samples[family])
+    return "\n".join(lines) + "\n"
+
+
+async def _supervise(workers: list[Worker], proxy: SessionProxy) -> None:
+    """Restarts workers that exit and ends idle sessions."""
+    while True:
+        await asyncio.sleep(WORKER_RESTART_DELAY)
+        await proxy.expire_idle()
+        for worker in workers:
+            code = worker.process.poll() if worker.process else None
+            if code is not None:
+                logger.warning("Worker %d exited with %s, restarting", worker.index, code)
+                proxy.forget(worker)
+                worker.start()
+
+
+async def serve(port: int, workers: int = HTTP_WORKERS, ssl_context: Optional[ssl.SSLContext] = None) -> None:
+    """Starts `workers` worker processes and the session-affinity proxy on `port`."""
+    pool = [Worker(i, WORKER_BASE_PORT + i) for i in range(workers)]
+    for worker in pool:
+        worker.start()
+    proxy = SessionProxy(pool)
+    await proxy.start()
+    # Cancel a forwarded request when its client disconnects, so open SSE streams are counted right
+    runner = web.AppRunner(proxy.app(), access_log=None, handler_cancellation=True)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port, ssl_context=ssl_context).start()
+    logger.info("Proxy on port %d -> %d workers (ports %d-%d)", port, workers, pool[0].port, pool[-1].port)
+    supervisor = asyncio.create_task(_supervise(pool, proxy))
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        # Stop the workers too when the proxy is terminated
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        supervisor.cancel()
+        await runner.cleanup()
+        await proxy.close()
+        for worker in pool:
+            worker.stop()